@@ -0,0 +1,164 @@
+"""
+API ning asosiy yo'llari uchun benchmark (manage.py run_benchmarks).
+
+Ssenariy - @scenario bilan ro'yxatga olingan funksiya: u count ta
+chaqiruvni (argumentsiz funksiyalar) tayyorlab qaytaradi, tayyorlash vaqti
+o'lchanmaydi. Har bir chaqiruvning devor vaqti (perf_counter), SQL
+so'rovlari soni (CaptureQueriesContext) va eng katta ajratilgan xotira
+(tracemalloc, chaqiruv oldidagi holatga nisbatan) yoziladi. Vaqt tracemalloc
+yoqilgan holda o'lchanadi - u barcha ssenariylarni bir xil sekinlashtiradi,
+shuning uchun natijalarni faqat bir-biri bilan solishtirish mumkin.
+
+compare() natijani saqlangan baseline bilan solishtiradi: vaqt yoki xotira
+threshold dan ko'proq oshsa yoki so'rovlar soni ko'paysa - regressiya.
+"""
+import statistics
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from main.models import Client
+
+from . import pdf
+
+SCENARIOS = {}
+
+
+class SkipScenario(Exception):
+    """Ssenariyni bu muhitda ishlatib bo'lmaydi (ma'lumot yoki kutubxona yo'q)."""
+
+
+def scenario(name):
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def contract_ids(count, **filters):
+    """Har bir chaqiruvga alohida shartnoma (bir shartnomaga ikki marta to'lanmasin)."""
+    ids = list(
+        Client.objects.filter(home__isnull=False, **filters).order_by('pk').values_list('pk', flat=True)[:count]
+    )
+    if len(ids) < count:
+        raise SkipScenario(f"{count} ta shartnoma kerak, bazada {len(ids)} ta")
+    return ids
+
+
+@scenario('dashboard')
+def dashboard(api, count):
+    return [partial(api.get, '/dashboard/')] * count
+
+
+@scenario('clients')
+def clients(api, count):
+    return [partial(api.get, '/clients/')] * count
+
+
+@scenario('process-payment')
+def process_payment(api, count):
+    return [
+        partial(api.post, f'/clients/{pk}/process-payment/',
+                {'payment_type': 'custom', 'custom_amount': 1000000}, format='json')
+        for pk in contract_ids(count, status='Rasmiylashtirilgan', residual__gt=0)
+    ]
+
+
+@scenario('contract-pdf')
+def contract_pdf(api, count):
+    # PDF keshda yo'q: fon vazifasiga qo'yish yo'li (202) o'lchanadi
+    return [partial(api.get, f'/contract-pdf/{pk}/') for pk in contract_ids(count)]
+
+
+@scenario('contract-pdf-render')
+def contract_pdf_render(api, count):
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        raise SkipScenario(f"WeasyPrint ishlamaydi: {e}")
+    contracts = Client.objects.select_related('client', 'home__home', 'home__building__city')
+    return [
+        partial(pdf.render_artifact, 'shartnoma', contract)
+        for contract in contracts.filter(pk__in=contract_ids(count))
+    ]
+
+
+def measure(call):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = call()
+        elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - before
+    status = getattr(result, 'status_code', None)
+    if status is not None and status >= 400:
+        raise RuntimeError(f"javob {status}: {getattr(result, 'data', '')}")
+    return elapsed, len(queries), peak, status
+
+
+def run(names=None, repeat=5, warmup=1):
+    """
+    Ssenariylarni ishga tushiradi. {nomi: natija} qaytadi; ishlatib
+    bo'lmaganlari {'skipped': sabab}, xato javob berganlari {'error': ...}
+    bo'ladi. Bazaga yozadigan ssenariylar bor, shuning uchun chaqiruvchi
+    tranzaksiyani bekor qilishi kerak.
+    """
+    api = APIClient()
+    api.force_authenticate(User.objects.get_or_create(username='benchmark')[0])
+    results = {}
+    tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(PDF_CACHE_DIR=cache_dir):
+            for name in names or SCENARIOS:
+                try:
+                    calls = SCENARIOS[name](api, warmup + repeat)
+                except SkipScenario as e:
+                    results[name] = {'skipped': str(e)}
+                    continue
+                try:
+                    runs = [measure(call) for call in calls][warmup:]
+                except RuntimeError as e:
+                    results[name] = {'error': str(e)}
+                    continue
+                times = [elapsed * 1000 for elapsed, _, _, _ in runs]
+                results[name] = {
+                    'runs': len(runs),
+                    'time_ms': round(statistics.median(times), 2),
+                    'time_ms_min': round(min(times), 2),
+                    'queries': max(count for _, count, _, _ in runs),
+                    'peak_kb': round(max(peak for _, _, peak, _ in runs) / 1024, 1),
+                    'status': runs[-1][3],
+                }
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def compare(results, baseline, threshold=0.25):
+    """
+    [(ssenariy, ko'rsatkich, baseline, hozirgi), ...] - regressiyalar.
+    Vaqt va xotira threshold (ulush) dan ko'p oshsa, so'rovlar soni esa
+    umuman oshsa regressiya hisoblanadi.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or 'skipped' in current or 'time_ms' not in base:
+            continue
+        if 'error' in current:
+            regressions.append((name, 'error', None, current['error']))
+            continue
+        for metric, allowed in (('time_ms', base['time_ms'] * (1 + threshold)),
+                                ('queries', base['queries']),
+                                ('peak_kb', base['peak_kb'] * (1 + threshold))):
+            if current[metric] > allowed:
+                regressions.append((name, metric, base[metric], current[metric]))
+    return regressions
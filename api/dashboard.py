@@ -0,0 +1,162 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from main.dates import day_filter, day_start
+from main.models import Building, Client, ClientInformation, Expense, Rasrochka
+from main.rollups import revenue_periods
+
+logger = logging.getLogger(__name__)
+
+# Dashboard vidjetlari bir nechta guruhlangan so'rov bilan hisoblanadi:
+# so'rovlar soni binolar yoki kunlar soniga bog'liq emas. Kun filtrlari
+# created__date emas, aware oraliq (main.dates) - created indeksi ishlaydi.
+
+HEARD_CHOICES = ['Instagramda', 'Telegramda', 'YouTubeda', 'Odamlar orasida', 'Xech qayerda']
+
+
+def expense_widgets(today):
+    one_week_ago = today - timedelta(days=7)
+    one_month_ago = today - timedelta(days=30)
+
+    try:
+        daily_expenses = Expense.objects.filter(
+            created__gte=day_start(one_week_ago)
+        ).annotate(
+            date=TruncDate('created')
+        ).values('date').annotate(
+            total=Sum('amount')
+        ).order_by('date')
+
+        expense_by_type = Expense.objects.filter(
+            created__gte=day_start(one_month_ago)
+        ).values(
+            'expense_type__name'
+        ).annotate(
+            total=Sum('amount')
+        ).order_by('-total')
+
+        building_expenses = Expense.objects.filter(
+            created__gte=day_start(one_month_ago),
+            building__isnull=False
+        ).values(
+            'building__name'
+        ).annotate(
+            total=Sum('amount')
+        ).order_by('-total')
+
+        return {
+            'daily': {
+                'dates': [expense['date'].strftime('%Y-%m-%d') for expense in daily_expenses],
+                'amounts': [float(expense['total']) for expense in daily_expenses]
+            },
+            'by_type': {
+                'types': [expense['expense_type__name'] or 'Nomalum' for expense in expense_by_type],
+                'amounts': [float(expense['total']) for expense in expense_by_type]
+            },
+            'by_building': {
+                'buildings': [expense['building__name'] or 'Nomalum' for expense in building_expenses],
+                'amounts': [float(expense['total']) for expense in building_expenses]
+            }
+        }
+    except Exception as e:
+        logger.error(f"Error processing expense data for HomePage: {e}")
+        return {
+            'daily': {'dates': [], 'amounts': []},
+            'by_type': {'types': [], 'amounts': []},
+            'by_building': {'buildings': [], 'amounts': []}
+        }
+
+
+def revenue_widgets(today):
+    # Ledger emas, kunlik tushum jadvali (main.rollups) yig'iladi
+    totals = revenue_periods({
+        'kunlik': (today, today),
+        'haftalik': (today - timedelta(days=7), None),
+        'oylik': (today - timedelta(days=30), None),
+        'umumiy': (None, None),
+    })
+    return {
+        # Avvalgidek: bazada to'lov jadvali bor-yo'qligi (tushum bo'lmasa ham True)
+        "status": Rasrochka.objects.exists(),
+        "kunlik_tushum": float(totals['kunlik']),
+        "haftalik_tushum": float(totals['haftalik']),
+        "oylik_tushum": float(totals['oylik']),
+        "umumiy": float(totals['umumiy']),
+    }
+
+
+def contract_widgets():
+    return Client.objects.aggregate(
+        total_debt=Sum('residual', filter=Q(debt=True)),
+        formalized=Count('id', filter=Q(status='Rasmiylashtirilgan')),
+        completed=Count('id', filter=Q(status='Tugallangan')),
+        debtor_count=Count('id', filter=Q(debt=True)),
+        nodebtor_count=Count('id', filter=Q(debt=False)),
+    )
+
+
+def client_widgets(today):
+    week_days = [today - timedelta(days=x) for x in range(6, -1, -1)]
+    aggregates = {
+        'total': Count('id'),
+        # Avvalgidek: joriy oy raqami bo'yicha, yilidan qat'i nazar (created__month)
+        'month': Count('id', filter=Q(created__month=today.month)),
+    }
+    for idx, heard in enumerate(HEARD_CHOICES):
+        aggregates[f'heard_{idx}'] = Count('id', filter=Q(heard=heard))
+    for idx, day in enumerate(week_days):
+        aggregates[f'day_{idx}'] = Count('id', filter=Q(**day_filter('created', day)))
+
+    counts = ClientInformation.objects.aggregate(**aggregates)
+    return {
+        'client_count': counts['total'],
+        'month_client': counts['month'],
+        'client_heard_counts': {heard: counts[f'heard_{idx}'] for idx, heard in enumerate(HEARD_CHOICES)},
+        'week_client_counts': [counts[f'day_{idx}'] for idx in range(len(week_days))],
+    }
+
+
+def building_widgets():
+    # Bandlik Building ustunlarida saqlanadi (main.occupancy), qayta sanash shart emas
+    buildings = list(Building.objects.select_related('city'))
+    return {
+        'building_count': len(buildings),
+        'building_names': [b.name for b in buildings],
+        'building_cities': [b.city.name if b.city else None for b in buildings],
+        'home_occupancy_percentage': [
+            round((b.homes_busy / b.homes_total) * 100) if b.homes_total > 0 else 0
+            for b in buildings
+        ],
+    }
+
+
+def build_dashboard():
+    today = timezone.localdate()
+
+    contracts = contract_widgets()
+    clients = client_widgets(today)
+    buildings = building_widgets()
+
+    return {
+        'tushum': revenue_widgets(today),
+        'client_count': clients['client_count'],
+        'building_count': buildings['building_count'],
+        'month_client': clients['month_client'],
+        'contract_formalized': contracts['formalized'],
+        'contract_completed': contracts['completed'],
+        'total_debt_amount': float(contracts['total_debt'] or 0),
+        'debtors': {
+            'debtor_count': contracts['debtor_count'],
+            'nodebtor_count': contracts['nodebtor_count']
+        },
+        'client_heard_counts': clients['client_heard_counts'],
+        'week_client_counts': clients['week_client_counts'],
+        'building_names': buildings['building_names'],
+        'building_cities': buildings['building_cities'],
+        'home_occupancy_percentage': buildings['home_occupancy_percentage'],
+        'expense_data': expense_widgets(today)
+    }
@@ -0,0 +1,113 @@
+"""
+Excel dagi havolalar bo'yicha rasmlarni parallel yuklab olish.
+
+Avval varaqdagi barcha URL lar yig'iladi, keyin ular cheklangan sondagi
+oqimlarda bitta requests.Session (ulanishlar qayta ishlatiladi) orqali
+yuklanadi. Bir xil URL bir marta yuklanadi; bir xil tarkibli rasmlar
+vaqtinchalik papkada SHA-256 bo'yicha bitta fayl bo'lib saqlanadi, shuning
+uchun yuklangan rasmlar xotirani egallamaydi.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+FETCH_WORKERS = 8
+FETCH_PER_HOST = 4
+FETCH_TIMEOUT = 30
+FETCH_RETRIES = 3
+
+
+class ImageFetcher:
+    def __init__(self, workers=FETCH_WORKERS, per_host=FETCH_PER_HOST, timeout=FETCH_TIMEOUT,
+                 retries=FETCH_RETRIES, backoff=0.5):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=workers,
+            pool_maxsize=workers,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=('GET',),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.directory = tempfile.TemporaryDirectory(prefix='image_fetch_')
+        # url -> vaqtinchalik fayl yo'li (yuklab bo'lmasa None)
+        self.results = {}
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+        self.directory.cleanup()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _store(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.directory.name, digest)
+        if not os.path.exists(path):
+            # Boshqa oqim shu rasmni yozayotgan bo'lishi mumkin - yarim fayl ko'rinmasin
+            fd, temp_path = tempfile.mkstemp(dir=self.directory.name)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        return path
+
+    def _fetch(self, url):
+        try:
+            with self._host_limit(url):
+                response = self.session.get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                logger.warning(f"Failed to download image from URL: {url} ({response.status_code})")
+                return url, None
+            return url, self._store(response.content)
+        except Exception as e:
+            logger.warning(f"Failed to download image from URL: {url} ({e})")
+            return url, None
+
+    def fetch_all(self, urls):
+        """URL larni parallel yuklaydi (oldin yuklanganlari va takrorlari o'tkazib yuboriladi)."""
+        pending = [url for url in dict.fromkeys(urls) if url not in self.results]
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for url, path in pool.map(self._fetch, pending):
+                self.results[url] = path
+
+    def get(self, url):
+        """Yuklangan rasm baytlari; fetch_all da bo'lmagan URL shu yerning o'zida yuklanadi."""
+        if url not in self.results:
+            self.fetch_all([url])
+        path = self.results[url]
+        if path is None:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
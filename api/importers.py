@@ -0,0 +1,262 @@
+"""
+Excel fayldan xonadonlarni import qilish.
+
+Varaq read_only rejimida qatorma-qator o'qiladi. Rasmlar va giperhavolalar
+uchun faqat indeks tuziladi (katak -> zip ichidagi yo'l / URL), rasm baytlari
+esa kerakli qatorga yetganda o'qiladi; havola bilan berilgan rasmlar esa
+importdan oldin parallel yuklab olinadi (api.fetcher). Bazaga yozish IMPORT_BATCH_SIZE
+qatorlik bloklar bilan (bulk_create) bajariladi, shuning uchun xotira varaq
+hajmiga bog'liq emas.
+"""
+import hashlib
+import logging
+import os
+
+import openpyxl
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.packaging.relationship import get_dependents, get_rels_path
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.xml.constants import IMAGE_NS, REL_NS, SHEET_MAIN_NS
+from openpyxl.xml.functions import fromstring, iterparse
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from main.blobs import retain
+from main.models import Home, HomeInformation
+from main.occupancy import rebuild_occupancy
+
+from .fetcher import ImageFetcher
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+
+# Excel ustunlari (1 dan boshlab): 7 - loyiha rasmi, 8 - chertoj rasmi
+FLOOR_PLAN_COLUMN = 7
+DRAWING_COLUMN = 8
+
+
+class SheetMedia:
+    """
+    Varaqdagi rasmlar va giperhavolalar indeksi: (qator, ustun) bo'yicha
+    zip ichidagi rasm yo'li yoki URL. Rasm baytlari image() chaqirilganda o'qiladi.
+    """
+
+    def __init__(self, archive, sheet_path):
+        self.archive = archive
+        self.images = {}
+        self.hyperlinks = {}
+
+        rels_path = get_rels_path(sheet_path)
+        if rels_path not in archive.namelist():
+            return
+        rels = get_dependents(archive, rels_path)
+        for rel in rels:
+            if rel.Type.endswith('/drawing'):
+                self._index_drawing(rel.target)
+        self._index_hyperlinks(sheet_path, rels)
+
+    def _index_drawing(self, path):
+        try:
+            drawing = SpreadsheetDrawing.from_tree(fromstring(self.archive.read(path)))
+        except TypeError:
+            logger.warning(f"Drawing {path} could not be parsed")
+            return
+        rels_path = get_rels_path(path)
+        if rels_path not in self.archive.namelist():
+            return
+        deps = get_dependents(self.archive, rels_path)
+        for rel in drawing._blip_rels:
+            dep = deps.get(rel.embed)
+            if dep is None or dep.Type != IMAGE_NS:
+                continue
+            position = (rel.anchor._from.row + 1, rel.anchor._from.col + 1)
+            self.images.setdefault(position, dep.target)
+
+    def _index_hyperlinks(self, sheet_path, rels):
+        external = {rel.id: rel.target for rel in rels if rel.TargetMode == 'External'}
+        if not external:
+            return
+        with self.archive.open(sheet_path) as src:
+            for _, element in iterparse(src):
+                if element.tag == f'{{{SHEET_MAIN_NS}}}hyperlink':
+                    target = external.get(element.get(f'{{{REL_NS}}}id'))
+                    if target:
+                        min_col, min_row, max_col, max_row = range_boundaries(element.get('ref'))
+                        for row in range(min_row, max_row + 1):
+                            for col in range(min_col, max_col + 1):
+                                self.hyperlinks[(row, col)] = target
+                elif element.tag == f'{{{SHEET_MAIN_NS}}}row':
+                    element.clear()
+
+    def image(self, row, col):
+        path = self.images.get((row, col))
+        if path is None:
+            return None
+        return self.archive.read(path)
+
+    def hyperlink(self, row, col):
+        return self.hyperlinks.get((row, col))
+
+
+def image_url(value, media, row_idx, col):
+    """Katakdagi rasm URL i: qiymatning o'zi yoki katakning giperhavolasi."""
+    if isinstance(value, str):
+        return value if value.startswith('http') else None
+    hyperlink = media.hyperlink(row_idx, col)
+    if value and hyperlink and hyperlink.startswith('http'):
+        return hyperlink
+    return None
+
+
+def collect_image_urls(sheet, media):
+    """Varaqdagi barcha rasm URL lari (parallel yuklash uchun oldindan yig'iladi)."""
+    for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+        for col in (FLOOR_PLAN_COLUMN, DRAWING_COLUMN):
+            value = row[col - 1] if len(row) >= col else None
+            url = image_url(value, media, row_idx, col)
+            if url:
+                yield url
+
+
+def read_image(value, media, fetcher, row_idx, col):
+    """
+    Katak uchun rasm baytlari: URL (fetcher yuklagan), fayl yo'li yoki
+    katakka joylangan rasm.
+    """
+    image_data = None
+    try:
+        url = image_url(value, media, row_idx, col)
+        if url:
+            image_data = fetcher.get(url)
+        elif isinstance(value, str) and value:
+            if os.path.exists(value):
+                with open(value, 'rb') as f:
+                    image_data = f.read()
+            else:
+                logger.warning(f"Row {row_idx}: File not found at path: {value}")
+        if image_data is None:
+            image_data = media.image(row_idx, col)
+    except Exception as e:
+        logger.warning(f"Row {row_idx}: Image read error: {e}")
+    return image_data
+
+
+def parse_home_row(row):
+    """Qator qiymatlaridan HomeInformation maydonlari (xato bo'lsa ValueError/TypeError)."""
+    def get_cell_value(idx, default):
+        val = row[idx] if len(row) > idx else None
+        return val if val is not None else default
+
+    return {
+        'price': int(get_cell_value(0, 0)),
+        'home_number': int(get_cell_value(1, 0)),
+        'padez_number': int(get_cell_value(2, 1)),
+        'home_floor': int(get_cell_value(3, 1)),
+        'xona': int(get_cell_value(4, 1)),
+        'field': float(str(get_cell_value(5, 0)).replace(',', '.')),
+    }
+
+
+def attach_image(home_info, field_name, filename, image_data, stored, row_idx):
+    """
+    Rasmni maydonga saqlaydi. Ombor (main.storage) bir xil rasmni baribir
+    bitta fayl qiladi; stored - import davomidagi {(maydon, hash): fayl nomi}
+    lug'ati, takroriy rasmni omborga qayta uzatmaslik uchun.
+    """
+    if image_data is None:
+        return
+    key = (field_name, hashlib.sha256(image_data).hexdigest())
+    field = getattr(home_info, field_name)
+    if key in stored:
+        field.name = stored[key]
+        return
+    try:
+        field.save(filename, ContentFile(image_data), save=False)
+        stored[key] = field.name
+    except Exception as e:
+        logger.warning(f"Row {row_idx}: Embedded {field_name} save error: {e}")
+
+
+def write_batch(building, batch):
+    """HomeInformation va Home larni bulk_create qiladi, home_model_id ni ikkinchi o'tishda yozadi."""
+    HomeInformation.objects.bulk_create(batch)
+    # bulk_create signal yubormaydi - rasmlar havolalarini shu yerda hisoblaymiz
+    retain(getattr(home_info, name).name for home_info in batch for name in HomeInformation.FILE_FIELDS)
+    homes = Home.objects.bulk_create([Home(building=building, home=home_info) for home_info in batch])
+    for home_info, home in zip(batch, homes):
+        home_info.home_model_id = home.pk
+    HomeInformation.objects.bulk_update(batch, ['home_model_id'])
+    return [home_info.pk for home_info in batch]
+
+
+def import_homes(building, source, batch_size=IMPORT_BATCH_SIZE, progress=None, on_batch=None):
+    """
+    source (fayl yo'li yoki fayl obyekti) dagi xonadonlarni building ga qo'shadi.
+    (qo'shilganlar soni, xatolar ro'yxati) qaytadi. Noto'g'ri qatorlar
+    o'tkazib yuboriladi. Har bir blok alohida tranzaksiyada yoziladi va
+    undan keyin progress(qo'shilganlar, xatolar) chaqiriladi; bazadagi xato
+    importni to'xtatadi, qo'shilgan uylarni tozalash chaqiruvchining ishi:
+    on_batch(ids) blok tranzaksiyasi ichida yozilgan HomeInformation id lari
+    bilan chaqiriladi, ya'ni id lar blok bilan birga saqlanadi (yoki birga
+    bekor qilinadi).
+    """
+    successful_count = 0
+    errors = []
+
+    def flush(batch):
+        nonlocal successful_count
+        if batch:
+            with transaction.atomic():
+                ids = write_batch(building, batch)
+                if on_batch is not None:
+                    on_batch(ids)
+            successful_count += len(batch)
+        if progress is not None:
+            progress(successful_count, errors)
+
+    wb = openpyxl.load_workbook(source, read_only=True)
+    fetcher = ImageFetcher()
+    try:
+        sheet = wb.active
+        media = SheetMedia(wb._archive, sheet._worksheet_path)
+        fetcher.fetch_all(collect_image_urls(sheet, media))
+        stored = {}
+
+        batch = []
+        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+            if all(value is None for value in row):
+                continue
+
+            try:
+                home_info = HomeInformation(busy=False, **parse_home_row(row))
+            except (ValueError, TypeError) as e:
+                errors.append(f"Qator {row_idx}: Ma'lumot formatida xatolik: {e}")
+                logger.error(f"Row {row_idx}: Data format error: {e}")
+                continue
+
+            suffix = f"{home_info.padez_number}_{home_info.home_number}.png"
+            for field_name, prefix, col in (
+                ('floor_plan', 'floor_plan', FLOOR_PLAN_COLUMN),
+                ('floor_plan_drawing', 'floor_drawing', DRAWING_COLUMN),
+            ):
+                value = row[col - 1] if len(row) >= col else None
+                image_data = read_image(value, media, fetcher, row_idx, col)
+                attach_image(home_info, field_name, f"{prefix}_{suffix}", image_data, stored, row_idx)
+            batch.append(home_info)
+
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        flush(batch)
+    finally:
+        fetcher.close()
+        wb.close()
+
+    with transaction.atomic():
+        rebuild_occupancy([building.pk])
+        building.status = True
+        building.save()
+
+    return successful_count, errors
@@ -0,0 +1,108 @@
+"""Fon vazifalari (main.jobs navbati orqali run_jobs buyrug'i bajaradi)."""
+import os
+
+from main import outbox
+from main.jobs import register, report_progress
+from main.models import Building, Client, HomeInformation, Job
+from main.thumbnails import warm_derivatives
+
+from . import pdf
+from .importers import IMPORT_BATCH_SIZE, import_homes
+
+
+def delete_homes(ids):
+    """
+    Import qo'shgan uylarni o'chiradi: Home kaskad bilan, rasmlar havolalari
+    esa HomeInformation post_delete signali orqali bo'shatiladi.
+    """
+    for offset in range(0, len(ids), IMPORT_BATCH_SIZE):
+        HomeInformation.objects.filter(pk__in=ids[offset:offset + IMPORT_BATCH_SIZE]).delete()
+
+
+def delete_upload(job):
+    # Yuklangan faylni saqlab qo'yish shart emas
+    job.file.delete(save=False)
+    Job.objects.filter(pk=job.pk).update(file='')
+
+
+@register('home_import')
+def home_import(job):
+    building = Building.objects.get(pk=job.payload['building'])
+
+    def progress(processed, errors):
+        report_progress(job, processed, len(errors), errors)
+
+    def record(ids):
+        # Blok tranzaksiyasi ichida: worker to'xtasa ham qaysi uylar yozilgani ma'lum
+        created.extend(ids)
+        job.payload['created'] = created
+        Job.objects.filter(pk=job.pk).update(payload=job.payload)
+
+    # Avvalgi urinish (worker to'xtagan, requeue_stale qayta navbatga qo'ygan)
+    # yozgan bloklar o'chiriladi va import fayl boshidan qayta bajariladi
+    created = list(job.payload.get('created', []))
+    if created:
+        delete_homes(created)
+        created = []
+        job.payload['created'] = created
+        Job.objects.filter(pk=job.pk).update(payload=job.payload)
+
+    try:
+        with job.file.open('rb') as source:
+            successful_count, errors = import_homes(building, source, progress=progress, on_batch=record)
+    except Exception:
+        # Faqat shu import qo'shgan uylar o'chiriladi
+        delete_homes(created)
+        building.status = False
+        building.save()
+        delete_upload(job)
+        raise
+    # Worker to'xtatilganda (KeyboardInterrupt va h.k.) fayl qayta urinish uchun qoladi
+    delete_upload(job)
+
+    # Ro'yxat sahifalari birinchi ochilganda kutib qolmasligi uchun
+    homes = HomeInformation.objects.filter(home_instances__building=building)
+    for field_name in HomeInformation.FILE_FIELDS:
+        names = homes.exclude(**{field_name: ''}).values_list(field_name, flat=True).distinct()
+        warm_derivatives(HomeInformation._meta.get_field(field_name).storage, names)
+
+    if errors:
+        detail = f"{successful_count} ta xonadon muvaffaqiyatli qo'shildi. Ba'zi xatolar yuz berdi."
+    else:
+        detail = f"{successful_count} ta xonadon muvaffaqiyatli qo'shildi."
+    return {"detail": detail, "created": successful_count}
+
+
+@register('thumbnails')
+def thumbnails(job):
+    storage = HomeInformation._meta.get_field('floor_plan').storage
+    count = warm_derivatives(storage, job.payload['names'])
+    return {"detail": f"{count} ta rasm nusxasi tayyor", "created": count}
+
+
+@register('contract_pdf')
+def contract_pdf(job):
+    contract = Client.objects.select_related('client', 'home__building__city', 'home__home').filter(
+        pk=job.payload['contract']
+    ).first()
+    if contract is None:
+        return {"detail": "Shartnoma topilmadi"}
+
+    payments = pdf.contract_payments(contract)
+    files = []
+    if contract.home and contract.home.building and contract.home.building.city:
+        files.append(pdf.render_artifact('shartnoma', contract, payments))
+    if contract.home and contract.home.home:
+        files.append(pdf.render_artifact('jadval', contract, payments))
+    return {"detail": "PDF tayyor", "files": [os.path.basename(path) for path in files]}
+
+
+
+@register('sms')
+def send_sms_queue(job):
+    def progress(sent, failed):
+        report_progress(job, sent, failed, [])
+
+    outbox.expire_stale()
+    sent, failed = outbox.drain(progress=progress)
+    return {"detail": f"{sent} ta SMS yuborildi, {failed} tasida xatolik.", "sent": sent, "failed": failed}
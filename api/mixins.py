@@ -0,0 +1,110 @@
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import reports
+
+
+class DynamicFieldsViewSetMixin:
+    """
+    ViewSet uchun ?fields=, ?omit=, ?expand= qo'llab-quvvatlashi.
+
+    Parametrlar serializer contextiga uzatiladi (serializers.DynamicFieldsMixin),
+    list/retrieve uchun esa querysetga faqat chiqadigan maydonlar talab
+    qiladigan select_related/prefetch_related qo'shiladi.
+    """
+    optimized_actions = ('list', 'retrieve')
+
+    def get_field_params(self):
+        if not hasattr(self, '_field_params'):
+            query = getattr(self.request, 'query_params', {})
+
+            def split(name):
+                return {value.strip() for value in query.get(name, '').split(',') if value.strip()}
+
+            self._field_params = {
+                'fields': split('fields') or None,
+                'omit': split('omit'),
+                'expand': split('expand'),
+            }
+        return self._field_params
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['field_params'] = self.get_field_params()
+        return context
+
+    def get_rendered_fields(self):
+        """Javobga chiqadigan (qisqartirilgandan keyingi) maydon nomlari."""
+        if not hasattr(self, '_rendered_fields'):
+            serializer = self.get_serializer_class()(context=self.get_serializer_context())
+            self._rendered_fields = set(serializer.fields)
+        return self._rendered_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.optimized_actions:
+            return queryset
+
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        rendered = self.get_rendered_fields()
+
+        def lookups(mapping_name):
+            mapping = getattr(meta, mapping_name, {})
+            found = []
+            for name, related in mapping.items():
+                if name in rendered:
+                    found.extend(lookup for lookup in related if lookup not in found)
+            return found
+
+        select = lookups('select_related_fields')
+        prefetch = lookups('prefetch_related_fields')
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class ExportViewSetMixin:
+    """
+    ViewSet uchun GET <prefix>/export/?output=csv|xlsx - ro'yxat filtrlari
+    bilan butun querysetni fayl qilib beradi.
+
+    export_columns - (sarlavha, qiymat) juftliklari; qiymat nuqtali atribut
+    yo'li ('home.building.name') yoki obyektni qabul qiladigan funksiya.
+    Qatorlar .iterator(chunk_size=export_chunk_size) bilan o'qiladi, bog'liq
+    obyektlar export_related orqali bitta so'rovda qo'shiladi.
+    """
+    export_columns = ()
+    export_related = ()
+    export_filename = 'export'
+    export_chunk_size = 2000
+
+    def export_value(self, obj, accessor):
+        if callable(accessor):
+            return accessor(obj)
+        for name in accessor.split('.'):
+            obj = getattr(obj, name, None)
+            if obj is None:
+                return None
+        return obj
+
+    def export_rows(self, queryset):
+        accessors = [accessor for _, accessor in self.export_columns]
+        for obj in queryset.iterator(chunk_size=self.export_chunk_size):
+            yield [self.export_value(obj, accessor) for accessor in accessors]
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        export_format = request.query_params.get('output', 'xlsx')
+        if export_format not in ('csv', 'xlsx'):
+            return Response({"detail": "Noto'g'ri fayl turi."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.export_related:
+            queryset = queryset.select_related(*self.export_related)
+        columns = [title for title, _ in self.export_columns]
+        return reports.table_response(
+            export_format, self.export_filename, columns, self.export_rows(queryset), self.export_filename,
+        )
@@ -0,0 +1,337 @@
+"""
+Shartnoma va to'lov jadvali PDF lari (WeasyPrint).
+
+FontConfiguration va jadval CSS i worker yashagan davomida bir marta
+yaratiladi (shriftlarni qidirish eng sekin qism). Tayyor PDF diskda
+PDF_CACHE_DIR da shartnoma id si va ma'lumotlar versiyasi (hash) bo'yicha
+saqlanadi: shartnoma o'zgarmagan bo'lsa, qayta yuklash fayldan beriladi.
+PDF lar shartnoma o'zgargach fon vazifasida (contract_pdf, api.jobs) yaratiladi.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template, render_to_string
+
+from main import jobs
+from main.models import Job, Rasrochka
+
+logger = logging.getLogger(__name__)
+
+MONTH_NAMES = ["Yanvar", "Fevral", "Mart", "Aprel", "May", "Iyun", "Iyul", "Avgust", "Sentabr", "Oktabr", "Noyabr", "Dekabr"]
+MONTH_NAMES_UZ = {
+    1: "yanvar", 2: "fevral", 3: "mart", 4: "aprel", 5: "may", 6: "iyun",
+    7: "iyul", 8: "avgust", 9: "sentabr", 10: "oktabr", 11: "noyabr", 12: "dekabr"
+}
+
+SCHEDULE_CSS = """
+    @page {
+        size: A4;
+        margin: 1.5cm;
+    }
+    body {
+        font-family: "Times New Roman", Times, serif;
+        font-size: 10px;
+        line-height: 1.2;
+    }
+    .title {
+        font-size: 14px;
+        text-align: center;
+        font-weight: bold;
+        margin-bottom: 10px;
+    }
+    .header-info {
+        margin-bottom: 10px;
+    }
+    .amount {
+        color: red;
+    }
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-bottom: 10px;
+    }
+    th, td {
+        border: 1px solid black;
+        padding: 1px;
+        text-align: center;
+        font-size: 9px;
+    }
+    th {
+        background-color: #f2f2f2;
+    }
+    .total-row {
+        font-weight: bold;
+    }
+    .signature {
+        margin-top: 15px;
+    }
+    .signature-line {
+        display: flex;
+        justify-content: space-between;
+    }
+"""
+
+
+def number_to_words_uz(number):
+    units = [
+        "", "бир", "икки", "уч", "тўрт", "беш", "олти", "етти", "саккиз", "тўққиз",
+    ]
+    tens = [
+        "", "ўн", "йигирма", "ўттиз", "қирқ", "эллик", "олтимиш", "етмиш", "саксон", "тўқсон",
+    ]
+    scales = ["", "минг", "миллион", "миллиард", "триллион", "квадриллион"]
+
+    def integer_to_words(num):
+        if num == 0:
+            return "нол"
+        words = []
+        num_str = str(num)[::-1]
+        groups = [num_str[i : i + 3] for i in range(0, len(num_str), 3)]
+
+        for idx, group in enumerate(groups):
+            group_word = []
+            hundreds, remainder = divmod(int(group[::-1]), 100)
+            tens_unit = remainder % 10
+            tens_place = remainder // 10
+
+            if hundreds > 0:
+                group_word.append(units[hundreds] + " юз")
+
+            if tens_place > 0:
+                group_word.append(tens[tens_place])
+
+            if tens_unit > 0:
+                group_word.append(units[tens_unit])
+
+            if group_word and scales[idx]:
+                group_word.append(scales[idx])
+
+            words = group_word + words
+
+        return " ".join(words)
+
+    integer_part = int(number)
+    fractional_part = round(number % 1, 2)
+    fractional_str = str(fractional_part)[2:] if fractional_part > 0 else None
+
+    result = integer_to_words(integer_part)
+    if fractional_str:
+        result += f" бутун {integer_to_words(int(fractional_str))}"
+
+    return result
+
+
+def qisqartirish(full_name):
+    parts = full_name.split()
+    if len(parts) == 3 or len(parts) == 4:
+        return f"{parts[0]} {parts[1][0].upper()}. {parts[2][0].upper()}."
+    elif len(parts) == 2:
+        return f"{parts[0]} {parts[1][0].upper()}."
+    elif len(parts) == 1:
+        return parts[0]
+    return full_name
+
+
+def money(value):
+    return f"{value:,}".replace(",", " ")
+
+
+@lru_cache(maxsize=None)
+def font_config():
+    from weasyprint.text.fonts import FontConfiguration
+    return FontConfiguration()
+
+
+STYLESHEETS = {
+    'schedule': SCHEDULE_CSS,
+}
+
+
+@lru_cache(maxsize=None)
+def stylesheet(name):
+    """STYLESHEETS dagi CSS ning bir marta parse qilingan nusxasi."""
+    from weasyprint import CSS
+    return CSS(string=STYLESHEETS[name], font_config=font_config())
+
+
+def build_pay_list(contract, payments, remaining_balance):
+    """To'lov jadvali qatorlari (shartnoma va jadval PDF lari uchun umumiy)."""
+    pay_list = []
+    current_balance = remaining_balance
+    for payment in payments:
+        if payment.month <= 0:
+            continue
+        month_date = payment.date
+        row = {
+            "number": payment.month,
+            "day": contract.pay_date or 15,
+            "month": MONTH_NAMES_UZ[month_date.month],
+            "year": month_date.year,
+            "payment": "0",
+            "remaining": "0",
+        }
+        if current_balance > 0:
+            payment_amount = min(int(payment.amount), current_balance)
+            row["payment"] = money(payment_amount)
+            row["remaining"] = money(max(0, current_balance - payment_amount))
+            current_balance = max(0, current_balance - payment_amount)
+        pay_list.append(row)
+    return pay_list
+
+
+def schedule_totals(contract, payments, total_price):
+    first_payment = next((payment for payment in payments if payment.month == 0), None)
+    down_payment = int(first_payment.amount_paid if first_payment else 0)
+    remaining_balance = int(total_price - down_payment)
+    return {
+        'total_price': money(total_price),
+        'down_payment': money(down_payment),
+        'remaining_balance': money(remaining_balance),
+        'down_payment_percentage': int((down_payment / total_price) * 100) if total_price > 0 else 0,
+        'pay_list': build_pay_list(contract, payments, remaining_balance),
+    }
+
+
+def contract_context(contract, payments):
+    price = contract.home_price
+    try:
+        foiz = (contract.payment / price) * 100
+        if foiz == int(foiz):
+            foiz_formatted = f"{int(foiz)}"
+        else:
+            foiz_formatted = f"{foiz:.2f}".rstrip('0').rstrip('.')
+    except (ZeroDivisionError, TypeError):
+        foiz_formatted = "0"
+
+    return {
+        "pk": contract.contract,
+        "contract": contract,
+        "month": MONTH_NAMES[contract.created.date().month - 1],
+        "price": price,
+        "price_text": number_to_words_uz(price),
+        "pay_text": number_to_words_uz(contract.payment),
+        "foiz": foiz_formatted,
+        "dr": qisqartirish(contract.client.full_name) if contract.client else "",
+        **schedule_totals(contract, payments, int(contract.home_price)),
+    }
+
+
+def schedule_context(contract, payments):
+    total_price = int(contract.home.home.field * contract.home.home.price)
+    return {
+        'contract': contract,
+        **schedule_totals(contract, payments, total_price),
+    }
+
+
+def template_version(name):
+    """Shablon fayli o'zgarsa, keshdagi PDF lar ham eskiradi."""
+    try:
+        origin = get_template(name).origin.name
+        return os.path.getmtime(origin)
+    except (TemplateDoesNotExist, OSError):
+        return None
+
+
+def data_version(template_name, contract, payments):
+    """PDF ga tushadigan barcha ma'lumotlardan hash."""
+    home = contract.home
+    info = home.home if home else None
+    building = home.building if home else None
+    state = {
+        'template': [template_name, template_version(template_name)],
+        'contract': [str(getattr(contract, field.attname)) for field in contract._meta.concrete_fields],
+        'client': [contract.client.full_name, contract.client.phone] if contract.client else None,
+        'home': [info.home_number, info.padez_number, info.home_floor, info.xona, info.field, info.price] if info else None,
+        'building': [building.name, building.city.name if building.city else None] if building else None,
+        'payments': [[p.month, str(p.date), str(p.amount), str(p.amount_paid), str(p.qoldiq)] for p in payments],
+    }
+    return hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()[:16]
+
+
+def write_pdf(html, base_url=None, stylesheets=()):
+    from weasyprint import HTML
+    return HTML(string=html, base_url=base_url).write_pdf(
+        stylesheets=[stylesheet(name) for name in stylesheets],
+        font_config=font_config(),
+    )
+
+
+def cache_path(kind, contract_id, version):
+    return os.path.join(settings.PDF_CACHE_DIR, f"{kind}-{contract_id}-{version}.pdf")
+
+
+def cached_pdf(kind, contract, version, render):
+    """Keshdagi PDF yo'li; yo'q bo'lsa render() bilan yaratib, eski versiyalarini o'chiradi."""
+    path = cache_path(kind, contract.pk, version)
+    if os.path.exists(path):
+        return path
+
+    content = render()
+    os.makedirs(settings.PDF_CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=settings.PDF_CACHE_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+    for old in glob.glob(cache_path(kind, contract.pk, '*')):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+def contract_payments(contract):
+    return list(Rasrochka.objects.filter(client=contract).order_by('month'))
+
+
+# Turi -> (shablon, kontekst funksiyasi, CSS lar)
+ARTIFACTS = {
+    'shartnoma': ("shart.html", contract_context, ()),
+    'jadval': ('list.html', schedule_context, ('schedule',)),
+}
+
+
+def artifact_path(kind, contract, payments=None):
+    """Shartnomaning joriy ma'lumotlariga mos PDF yo'li (fayl hali bo'lmasligi mumkin)."""
+    if payments is None:
+        payments = contract_payments(contract)
+    template_name = ARTIFACTS[kind][0]
+    return cache_path(kind, contract.pk, data_version(template_name, contract, payments))
+
+
+def render_artifact(kind, contract, payments=None):
+    """PDF ni (keshda bo'lmasa) yaratadi va yo'lini qaytaradi."""
+    if payments is None:
+        payments = contract_payments(contract)
+    template_name, build_context, stylesheets = ARTIFACTS[kind]
+    version = data_version(template_name, contract, payments)
+
+    def render():
+        html = render_to_string(template_name, build_context(contract, payments))
+        return write_pdf(html, base_url=settings.PDF_BASE_URL, stylesheets=stylesheets)
+    return cached_pdf(kind, contract, version, render)
+
+
+def enqueue_render(contract_id):
+    """Shartnoma PDF larini fon vazifasiga qo'yadi (navbatda turgan bo'lsa - o'shani qaytaradi)."""
+    job = Job.objects.filter(kind='contract_pdf', status='pending', payload__contract=contract_id).first()
+    if job is None:
+        job = jobs.enqueue('contract_pdf', {'contract': contract_id})
+    return job
+
+
+def render_after_commit(contract):
+    """Shartnoma yoki to'lovlari o'zgargan tranzaksiya tugagach PDF larni qayta tayyorlash."""
+    contract_id = contract.pk
+    transaction.on_commit(lambda: enqueue_render(contract_id))
@@ -0,0 +1,98 @@
+"""
+Hisobotlarni (PDF, CSV, XLSX) tayyorlash.
+
+PDF templates/reports/ dagi shablonlardan bir marta render qilinadi va
+bir marta kodlanadi. Katta ro'yxatlar uchun CSV va XLSX qatorlarni
+generatordan oladi va javobni bo'laklab uzatadi, shuning uchun xotira
+qatorlar soniga bog'liq emas.
+"""
+import csv
+import tempfile
+from io import BytesIO
+
+import openpyxl
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+EXPORT_FORMATS = ('pdf', 'csv', 'xlsx')
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def money(value):
+    return f"{value:,}"
+
+
+def local_date(value):
+    """Excel vaqt zonali datetime ni qabul qilmaydi - mahalliy sana satri."""
+    if value is None:
+        return None
+    return timezone.localtime(value).strftime('%d.%m.%Y')
+
+
+def attachment(response, filename):
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def pdf_response(template_name, context, filename):
+    """Shablondan PDF javob; xhtml2pdf xato bersa None qaytadi."""
+    from xhtml2pdf import pisa
+
+    html = render_to_string(template_name, context)
+    output = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=output, encoding='utf-8')
+    if pisa_status.err:
+        return None
+    return attachment(HttpResponse(output.getvalue(), content_type="application/pdf"), f"{filename}.pdf")
+
+
+class Echo:
+    """csv.writer uchun: yozilgan qatorni saqlamasdan qaytaradi."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(columns, rows, filename):
+    def stream():
+        writer = csv.writer(Echo())
+        # Excel UTF-8 ni to'g'ri ochishi uchun BOM
+        yield '\ufeff' + writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+    return attachment(response, f"{filename}.csv")
+
+
+def xlsx_response(columns, rows, filename, title=None):
+    """write_only rejimdagi kitob vaqtinchalik faylga yoziladi va bo'laklab uzatiladi."""
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet(title=(title or filename)[:31])
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    wb.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"{filename}.xlsx", content_type=XLSX_CONTENT_TYPE)
+
+
+def table_response(export_format, title, columns, rows, filename, pdf_columns=None, pdf_row=None):
+    """
+    Jadval ko'rinishidagi hisobot. rows - generator (CSV/XLSX uchun xom
+    qiymatlar); PDF da har bir qator pdf_row bilan formatlanadi.
+    """
+    if export_format == 'csv':
+        return csv_response(columns, rows, filename)
+    if export_format == 'xlsx':
+        return xlsx_response(columns, rows, filename, title)
+    if pdf_row is not None:
+        rows = (pdf_row(row) for row in rows)
+    return pdf_response("reports/table.html", {
+        "title": title,
+        "columns": pdf_columns or columns,
+        "rows": rows,
+    }, filename)
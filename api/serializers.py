@@ -2,26 +2,81 @@ from rest_framework import serializers
 from main.models import (
     City, Building, HomeInformation, Home,
     ClientInformation, Client, Rasrochka,
-    ExpenseType, Expense, BotUser
+    ExpenseType, Expense, BotUser, Job
 )
 from django.conf import settings # For media URL
-
-class CitySerializer(serializers.ModelSerializer):
+from main.thumbnails import derivative_url
+
+
+class DynamicFieldsMixin:
+    """
+    ?fields=, ?omit= va ?expand= parametrlariga qarab maydonlarni qisqartiradi
+    (context['field_params'], api.mixins.DynamicFieldsViewSetMixin beradi).
+    Parametrlar faqat eng yuqori serializerga qo'llanadi. Meta.expandable_fields
+    dagi maydonlar faqat ?expand= da so'ralganda qo'shiladi.
+
+    Meta.select_related_fields / Meta.prefetch_related_fields - maydon nomidan
+    u talab qiladigan lookup'larga moslik; ViewSet faqat chiqadigan maydonlar
+    uchun JOIN/prefetch qiladi.
+    """
+
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        params = (self.context.get('field_params') or {}) if self.is_root() else {}
+        only = params.get('fields')
+        omit = params.get('omit', set())
+        expand = params.get('expand', set())
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+
+        for name in list(fields):
+            if name in expandable:
+                keep = name in expand
+            else:
+                keep = (only is None or name in only) and name not in omit
+            if not keep:
+                fields.pop(name)
+        return fields
+
+class CitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = City
         fields = '__all__'
 
-class BuildingSerializer(serializers.ModelSerializer):
+class BuildingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     city_name = serializers.CharField(source='city.name', read_only=True)
     
     class Meta:
         model = Building
         fields = '__all__'
+        select_related_fields = {'city_name': ('city',)}
+
+class DerivativeImageField(serializers.ReadOnlyField):
+    """Rasmning kichraytirilgan WebP nusxasi URL i (main.thumbnails, nusxa hali yo'q bo'lsa asl rasm)"""
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        super().__init__(**kwargs)
 
-class HomeInformationSerializer(serializers.ModelSerializer):
+    def to_representation(self, value):
+        url = derivative_url(value, self.size)
+        if url is None:
+            return None
+        return self.context['request'].build_absolute_uri(url)
+
+class HomeInformationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Ensure URLs are absolute for external API consumption
     floor_plan_url = serializers.SerializerMethodField()
     floor_plan_drawing_url = serializers.SerializerMethodField()
+    floor_plan_thumb_url = DerivativeImageField('thumb', source='floor_plan')
+    floor_plan_medium_url = DerivativeImageField('medium', source='floor_plan')
+    floor_plan_drawing_thumb_url = DerivativeImageField('thumb', source='floor_plan_drawing')
+    floor_plan_drawing_medium_url = DerivativeImageField('medium', source='floor_plan_drawing')
 
     class Meta:
         model = HomeInformation
@@ -37,7 +92,7 @@ class HomeInformationSerializer(serializers.ModelSerializer):
             return self.context['request'].build_absolute_uri(obj.floor_plan_drawing.url)
         return None
 
-class HomeSerializer(serializers.ModelSerializer):
+class HomeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     building_name = serializers.CharField(source='building.name', read_only=True)
     city_name = serializers.CharField(source='building.city.name', read_only=True)
     home_info = HomeInformationSerializer(source='home', read_only=True) # Nested serializer for HomeInformation
@@ -45,19 +100,24 @@ class HomeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Home
         fields = '__all__'
+        select_related_fields = {
+            'building_name': ('building',),
+            'city_name': ('building__city',),
+            'home_info': ('home',),
+        }
 
-class ClientInformationSerializer(serializers.ModelSerializer):
+class ClientInformationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ClientInformation
         fields = '__all__'
 
-class RasrochkaSerializer(serializers.ModelSerializer):
+class RasrochkaSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Rasrochka
         fields = '__all__'
         read_only_fields = ('qoldiq',) # qoldiq is calculated
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     client_info = ClientInformationSerializer(source='client', read_only=True)
     home_info = HomeSerializer(source='home', read_only=True)
     payments = RasrochkaSerializer(many=True, read_only=True) # Nested payments
@@ -66,21 +126,79 @@ class ClientSerializer(serializers.ModelSerializer):
         model = Client
         fields = '__all__'
         read_only_fields = ('residual', 'oylik_tolov', 'count_month', 'residu', 'debt', 'created')
+        select_related_fields = {
+            'client_info': ('client',),
+            'home_info': ('home__building__city', 'home__home'),
+        }
+        prefetch_related_fields = {'payments': ('payments',)}
+
+class ClientSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Ro'yxat uchun ixcham shartnoma: bog'liq obyektlar select_related bilan,
+    to'lov summalari esa so'rovda oldindan hisoblangan (annotate).
+    """
+    client_name = serializers.CharField(source='client.full_name', read_only=True, default=None)
+    client_phone = serializers.CharField(source='client.phone', read_only=True, default=None)
+    building = serializers.IntegerField(source='home.building_id', read_only=True, default=None)
+    building_name = serializers.CharField(source='home.building.name', read_only=True, default=None)
+    city_name = serializers.CharField(source='home.building.city.name', read_only=True, default=None)
+    padez_number = serializers.IntegerField(source='home.home.padez_number', read_only=True, default=None)
+    home_number = serializers.CharField(source='home.home.home_number', read_only=True, default=None)
+    total_amount = serializers.IntegerField(read_only=True)
+    total_paid = serializers.IntegerField(read_only=True)
+    total_remaining = serializers.IntegerField(read_only=True)
+    remaining_months = serializers.IntegerField(read_only=True)
+    client_info = ClientInformationSerializer(source='client', read_only=True)
+    home_info = HomeSerializer(source='home', read_only=True)
+    payments = RasrochkaSerializer(many=True, read_only=True)
 
-class ExpenseTypeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Client
+        fields = (
+            'id', 'contract', 'status', 'debt', 'created', 'client', 'client_name', 'client_phone',
+            'home', 'building', 'building_name', 'city_name', 'padez_number', 'home_number',
+            'home_price', 'payment', 'term', 'pay_date', 'residual', 'oylik_tolov',
+            'total_amount', 'total_paid', 'total_remaining', 'remaining_months',
+            'client_info', 'home_info', 'payments',
+        )
+        expandable_fields = ('client_info', 'home_info', 'payments')
+        select_related_fields = {
+            'client_name': ('client',),
+            'client_phone': ('client',),
+            'client_info': ('client',),
+            'building': ('home',),
+            'building_name': ('home__building',),
+            'city_name': ('home__building__city',),
+            'padez_number': ('home__home',),
+            'home_number': ('home__home',),
+            'home_info': ('home__building__city', 'home__home'),
+        }
+        prefetch_related_fields = {'payments': ('payments',)}
+
+class ExpenseTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ExpenseType
         fields = '__all__'
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     expense_type_name = serializers.CharField(source='expense_type.name', read_only=True)
     building_name = serializers.CharField(source='building.name', read_only=True)
 
     class Meta:
         model = Expense
         fields = '__all__'
+        select_related_fields = {
+            'expense_type_name': ('expense_type',),
+            'building_name': ('building',),
+        }
 
-class BotUserSerializer(serializers.ModelSerializer):
+class BotUserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BotUser
         fields = '__all__'
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ('id', 'kind', 'status', 'processed', 'failed', 'errors', 'result', 'created', 'started', 'finished')
+
@@ -11,7 +11,8 @@ from .views import (
     BuildingInformationAPIView, HomeUploadAPIView, HomeDownloadAPIView,
     HomeDemoDownloadAPIView, ClientDownloadAPIView, ContractPDFView,
     JadvalDownloadAPIView, StatistikaAPIView, StatisticsDownloadAllAPIView,
-    StatisticsDownloadAPIView, HomePageAPIView
+    StatisticsDownloadAPIView, HomePageAPIView, JobStatusAPIView, RevenueAPIView,
+    SmsCampaignAPIView
 )
 
 from django.urls import path, include
@@ -55,6 +56,8 @@ urlpatterns = [
     path('dashboard/', HomePageAPIView.as_view(), name='api_home_page'),
     path('building-information/', BuildingInformationAPIView.as_view(), name='building_information_api'),
     path('home-upload/', HomeUploadAPIView.as_view(), name='home_upload_api'),
+    path('jobs/<int:pk>/', JobStatusAPIView.as_view(), name='job_status_api'),
+    path('sms-campaigns/<int:pk>/', SmsCampaignAPIView.as_view(), name='sms_campaign_api'),
     path('home-download/', HomeDownloadAPIView.as_view(), name='home_download_api'),
     path('home-download-template/', HomeDemoDownloadAPIView.as_view(), name='home_demo_download_api'),
     path('client-export/', ClientDownloadAPIView.as_view(), name='client_export_api'),
@@ -63,6 +66,7 @@ urlpatterns = [
     path('statistics/', StatistikaAPIView.as_view(), name='statistika_api'),
     path('statistics/download-all/', StatisticsDownloadAllAPIView.as_view(), name='statistika_download_all_api'),
     path('statistics/download/<str:date_range>/', StatisticsDownloadAPIView.as_view(), name='statistika_download_date_api'),
+    path('statistics/revenue/', RevenueAPIView.as_view(), name='statistika_revenue_api'),
 
     path('', include(router.urls)),
 
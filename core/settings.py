@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -132,6 +133,44 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Fayl keshi barcha gunicorn workerlari uchun umumiy, shuning uchun bitta
+# workerdagi invalidatsiya boshqalariga ham ta'sir qiladi.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+# Qarzdorlar statistikasi keshining maksimal yashash vaqti (sekund)
+DEBT_SUMMARY_TIMEOUT = 300
+
+# Har bir worker bazadan bir yo'la oladigan shartnoma raqamlari soni.
+# 1 - raqamlar oraliqsiz; kattaroq qiymat ko'p workerda qulfni kamroq kutadi.
+CONTRACT_NUMBER_BLOCK_SIZE = 1
+
+# Tayyor shartnoma/jadval PDF lari keshi (api.pdf). FileBasedCache papkasidan alohida:
+# cache.clear() va eskirgan yozuvlarni tozalash PDF fayllarga tegmasin
+PDF_CACHE_DIR = BASE_DIR / 'pdf_cache'
+# PDF shablonlaridagi nisbiy havolalar (rasm, shrift) shu manzilga nisbatan olinadi
+PDF_BASE_URL = BASE_DIR.as_uri() + '/'
+
+# SMS provayderi (main.sms). Token kodda saqlanmaydi - muhit o'zgaruvchisidan.
+SMS_API_URL = 'https://notify.eskiz.uz/api/message/sms/send'
+SMS_API_TOKEN = os.environ.get('SMS_API_TOKEN', '')
+SMS_SENDER = '4546'
+# Bir vaqtdagi so'rovlar va sekundiga yuboriladigan SMS soni (provayder limiti)
+SMS_CONCURRENCY = 10
+SMS_RATE_LIMIT = 20
+SMS_RETRIES = 3
+SMS_TIMEOUT = 15
+
+# To'lov sanasiga shuncha kun qolganda eslatma yuboriladi (send_reminders)
+REMINDER_DAYS_BEFORE = 3
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -0,0 +1,58 @@
+"""
+Tarkib bo'yicha saqlangan fayllar (main.storage) uchun havolalar hisoblagichi.
+
+Har bir fayl nomiga nechta yozuv ishora qilishi StoredBlob.refs da turadi.
+Hisoblagich nolga tushsa, fayl tranzaksiya muvaffaqiyatli tugagach o'chiriladi.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from main.models import StoredBlob
+from main.storage import content_storage
+from main.thumbnails import delete_derivatives
+
+
+def _grouped(names):
+    """{soni: [nomlar]} - bir xil sondagi nomlar bitta UPDATE bilan yangilanadi."""
+    groups = defaultdict(list)
+    for name, count in Counter(name for name in names if name).items():
+        groups[count].append(name)
+    return groups
+
+
+def retain(names):
+    groups = _grouped(names)
+    if not groups:
+        return
+    StoredBlob.objects.bulk_create(
+        [StoredBlob(name=name) for group in groups.values() for name in group],
+        ignore_conflicts=True,
+    )
+    for count, group in groups.items():
+        StoredBlob.objects.filter(name__in=group).update(refs=F('refs') + count)
+
+
+def release(names):
+    """Havolalarni kamaytiradi va hech kim ishlatmaydigan fayllarni o'chiradi."""
+    groups = _grouped(names)
+    if not groups:
+        return
+    for count, group in groups.items():
+        StoredBlob.objects.filter(name__in=group).update(refs=F('refs') - count)
+
+    released = [name for group in groups.values() for name in group]
+    orphans = list(StoredBlob.objects.filter(name__in=released, refs__lte=0).values_list('name', flat=True))
+    if not orphans:
+        return
+    StoredBlob.objects.filter(name__in=orphans, refs__lte=0).delete()
+
+    def delete_files():
+        storage = content_storage()
+        for name in orphans:
+            # Shu orada qayta yuklangan bo'lsa, faylga tegmaymiz
+            if not StoredBlob.objects.filter(name=name).exists():
+                storage.delete(name)
+                delete_derivatives(storage, name)
+    transaction.on_commit(delete_files)
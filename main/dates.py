@@ -0,0 +1,31 @@
+"""
+Mahalliy kunlarni DateTimeField filtrlari uchun aware oraliqqa aylantirish.
+
+created__date=... kabi filtrlar har bir qatorda ustunni sanaga o'giradi
+(CAST/django_datetime_cast_date), shuning uchun ustundagi indeks
+ishlatilmaydi. Buning o'rniga [kun boshi, keyingi kun boshi) oralig'i
+beriladi: created__gte=day_start(kun), created__lt=day_start(kun + 1 kun).
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def day_start(day):
+    """day (date) ning mahalliy vaqt bo'yicha boshlanishi (aware datetime)."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_range(start, end=None):
+    """
+    [start, end] kunlari (ikkalasi ham kiradi) uchun (boshi, oxiri) - oxiri
+    kirmaydi, ya'ni field__gte=boshi, field__lt=oxiri. end berilmasa bitta kun.
+    """
+    end = start if end is None else end
+    return day_start(start), day_start(end + timedelta(days=1))
+
+
+def day_filter(field, start, end=None):
+    """field uchun [start, end] kunlari Q/filter kwarglari."""
+    lower, upper = day_range(start, end)
+    return {f'{field}__gte': lower, f'{field}__lt': upper}
@@ -0,0 +1,108 @@
+"""
+Bazadagi Job jadvali ustidagi oddiy vazifalar navbati (tashqi broker kerak emas).
+
+Vazifa turlari ilovalarning jobs.py modullarida @register('tur') bilan
+ro'yxatdan o'tadi, enqueue() navbatga qo'shadi, run_jobs buyrug'i esa
+navbatni bajaradi. Bir nechta worker bir vaqtda ishlashi mumkin: vazifani
+faqat pending -> running shartli UPDATE ini bajargan worker oladi.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from main.models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def register(kind):
+    """Vazifa turi uchun bajaruvchi funksiya (handler(job)) ni ro'yxatga oladi."""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def discover():
+    """Barcha ilovalarning jobs.py modullarini yuklaydi."""
+    autodiscover_modules('jobs')
+
+
+def enqueue(kind, payload=None, file=None):
+    job = Job(kind=kind, payload=payload or {})
+    if file is not None:
+        job.file.save(file.name, file, save=False)
+    job.save()
+    return job
+
+
+def claim_next():
+    """Eng eski navbatdagi vazifani oladi (boshqa worker olgan bo'lsa - keyingisini)."""
+    pending = Job.objects.filter(status='pending').order_by('created', 'id').values_list('id', flat=True)
+    for job_id in pending[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job_id, status='pending').update(status='running', started=now, heartbeat=now)
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def report_progress(job, processed, failed, errors):
+    """
+    Jarayonni bazaga yozadi (status endpointi shu qiymatlarni qaytaradi).
+    Bu vazifa hali ishlayotganini ham bildiradi (heartbeat).
+    """
+    job.processed, job.failed, job.errors = processed, failed, list(errors)
+    job.heartbeat = timezone.now()
+    Job.objects.filter(pk=job.pk).update(
+        processed=job.processed, failed=job.failed, errors=job.errors, heartbeat=job.heartbeat,
+    )
+
+
+def run_job(job):
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"Noma'lum vazifa turi: {job.kind}")
+        result = handler(job)
+    except Exception as e:
+        logger.exception(f"Job {job.pk} ({job.kind}) failed: {e}")
+        job.status = 'failed'
+        job.result = {'detail': str(e)}
+    else:
+        job.status = 'done'
+        job.result = result
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'result', 'finished'])
+    return job
+
+
+def run_pending(limit=None):
+    """Navbat bo'shaguncha (yoki limit ta) vazifani bajaradi, bajarilganlar sonini qaytaradi."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def requeue_stale(older_than):
+    """
+    Worker to'xtab qolgan vazifalarni qayta navbatga qo'yadi: older_than dan
+    beri heartbeat yangilanmagan running vazifalar. Uzoq, lekin jarayonini
+    yozib turgan vazifa (katta import) qayta ishga tushirilmaydi. Vazifa
+    qayta bajarilganda avvalgi urinish natijasini o'zi hisobga olishi kerak
+    (masalan home_import payload['created'] dagi uylarni o'chiradi).
+    """
+    cutoff = timezone.now() - older_than
+    stale = Q(heartbeat__lt=cutoff) | Q(heartbeat__isnull=True, started__lt=cutoff)
+    with transaction.atomic():
+        return Job.objects.filter(stale, status='running').update(status='pending', started=None, heartbeat=None)
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from main import outbox
+
+
+class Command(BaseCommand):
+    help = "SMS navbatini (SmsMessage) bo'shaguncha yuboradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox.SMS_BATCH_SIZE,
+                            help="Bir blokda olinadigan xabarlar soni")
+        parser.add_argument('--stale-minutes', type=int, default=30,
+                            help="Shuncha daqiqadan beri 'sending' turgan xabarlar 'unknown' holatiga o'tadi (qayta yuborilmaydi)")
+
+    def handle(self, *args, **options):
+        expired = outbox.expire_stale(timedelta(minutes=options['stale_minutes']))
+        if expired:
+            self.stdout.write(self.style.WARNING(f"{expired} ta to'xtab qolgan xabarning holati noma'lum, qayta yuborilmadi."))
+        sent, failed = outbox.drain(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{sent} ta SMS yuborildi, {failed} tasida xatolik."))
@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+from textwrap import indent
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main import reminders, seeding
+from main.dates import day_filter, day_start
+from main.models import Client, ClientInformation, Expense, Home, Rasrochka
+
+# 0011_query_indexes migratsiyasi qo'shgan indekslar (--compare ularsiz rejani ko'rsatadi)
+QUERY_INDEXES = (
+    'client_created_idx', 'client_status_created_idx', 'client_debt_created_idx', 'client_info_created_idx',
+    'expense_created_idx', 'home_building_created_idx',
+    'rasrochka_client_unpaid_idx', 'rasrochka_client_month_idx', 'rasrochka_paid_date_idx',
+)
+
+
+def hot_queries():
+    """
+    Eng ko'p ishlatiladigan so'rovlar: {nomi: queryset}. Agregatlar o'rniga
+    ularning filtrlangan querysetlari (reja bir xil).
+    """
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    contract = Client.objects.order_by('pk').values_list('pk', flat=True).first()
+    building = Home.objects.order_by('pk').values_list('building_id', flat=True).first()
+    return {
+        # Qisman to'lov: shartnomaning to'lanmagan oylari sana tartibida
+        'contract_unpaid': Rasrochka.objects.filter(client=contract, qoldiq__gt=0).order_by('date'),
+        'contract_schedule': Rasrochka.objects.filter(client=contract).order_by('month'),
+        # Shartnomalar ro'yxati va filtrlari
+        'contracts_list': Client.objects.order_by('-created')[:25],
+        'contracts_by_status': Client.objects.filter(status='Rasmiylashtirilgan').order_by('-created')[:25],
+        'contracts_debtors': Client.objects.filter(debt=True).order_by('-created')[:25],
+        'building_homes': Home.objects.filter(building=building).order_by('-created')[:25],
+        # Statistika va dashboard sana oraliqlari
+        'statistics_contracts': Client.objects.filter(**day_filter('created', month_start, today)),
+        'statistics_income': Rasrochka.objects.filter(
+            amount_paid__gt=0, **day_filter('date', month_start, today),
+        ).order_by().values('amount_paid'),
+        'clients_today': ClientInformation.objects.filter(**day_filter('created', today)),
+        # Taqqoslash uchun: created__date har bir qatorda sanaga o'giriladi
+        'clients_today_date_cast': ClientInformation.objects.filter(created__date=today),
+        'expenses_week': Expense.objects.filter(created__gte=day_start(today - timedelta(days=7))),
+        'reminders_overdue': reminders.due_installments(reminders.KIND_OVERDUE, today, 3),
+        'debtors_summary': Client.objects.filter(debt=True).order_by().values('residual'),
+    }
+
+
+def explain(queryset, label):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        # Oxiridagi izoh SQL matnini har bosqichda boshqacha qiladi: aks holda sqlite3
+        # tayyorlangan so'rovlar keshidan DROP INDEX dan oldingi rejani qaytaradi
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql} /* {label} */", params)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def collect_plans(label):
+    return {name: explain(queryset, label) for name, queryset in hot_queries().items()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Asosiy so'rovlarning bajarilish rejasini (EXPLAIN) chiqaradi. --seed bilan sinov "
+        "ma'lumotlari yaratiladi, --compare bilan migratsiya indekslarisiz reja ham ko'rsatiladi. "
+        "Barcha o'zgarishlar oxirida bekor qilinadi (rollback)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Shuncha mijozli sinov ma'lumotlarini yaratish (main.seeding)")
+        parser.add_argument('--compare', action='store_true',
+                            help="QUERY_INDEXES ni vaqtincha o'chirib, oldingi rejani ham ko'rsatish")
+        parser.add_argument('--output', help="Rejalarni JSON faylga yozish")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                counts = seeding.seed(clients=options['seed'], homes=max(options['seed'] // 6, 1))
+                self.stdout.write(f"Sinov ma'lumotlari: {counts}")
+            plans = {'after': collect_plans('after')}
+            if options['compare']:
+                with connection.cursor() as cursor:
+                    for name in QUERY_INDEXES:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+                plans['before'] = collect_plans('before')
+            transaction.set_rollback(True)
+
+        for name, plan in plans['after'].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            if 'before' in plans:
+                self.stdout.write("  oldin:\n" + indent(plans['before'][name], '    '))
+            self.stdout.write("  hozir:\n" + indent(plan, '    '))
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'vendor': connection.vendor, **plans}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Rejalar {options['output']} fayliga yozildi."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = "Binolar bandlik hisoblagichlarini (jami/band/bo'sh uylar) noldan qayta hisoblaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--building', type=int, action='append', dest='buildings',
+                            help="Faqat shu bino(lar) uchun (bir necha marta berish mumkin)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = rebuild_occupancy(options['buildings'])
+        self.stdout.write(self.style.SUCCESS(f"{changed} ta bino hisoblagichi yangilandi."))
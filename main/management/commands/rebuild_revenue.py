@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Kunlik tushum jadvalini (DailyRevenue) to'lovlar jadvalidan noldan qayta hisoblaydi"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"{rows} ta kunlik tushum qatori yozildi."))
@@ -0,0 +1,85 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import benchmarks
+from main import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "API ning asosiy yo'llari (dashboard, shartnomalar ro'yxati, to'lov, shartnoma PDF) "
+        "uchun benchmark: vaqt, SQL so'rovlar soni va xotira. Natija JSON ga yoziladi va "
+        "baseline bilan solishtiriladi. Barcha o'zgarishlar oxirida bekor qilinadi (rollback)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Ssenariylar (standart: hammasi - {', '.join(benchmarks.SCENARIOS)})")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Shuncha mijozli sinov ma'lumotlarini yaratish (main.seeding)")
+        parser.add_argument('--repeat', type=int, default=5, help="Har bir ssenariy necha marta o'lchanadi")
+        parser.add_argument('--warmup', type=int, default=1, help="O'lchanmaydigan dastlabki chaqiruvlar soni")
+        parser.add_argument('--output', help="Natijalarni JSON faylga yozish")
+        parser.add_argument('--baseline', help="Solishtiriladigan baseline JSON fayli")
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Natijani --baseline fayliga yozish (solishtirmasdan)")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Vaqt va xotira uchun ruxsat etilgan o'sish ulushi")
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(benchmarks.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Noma'lum ssenariy: {', '.join(sorted(unknown))}")
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError("--save-baseline uchun --baseline fayli ko'rsatilishi kerak")
+
+        dataset = {}
+        with transaction.atomic():
+            if options['seed']:
+                dataset = seeding.seed(clients=options['seed'], homes=max(options['seed'] // 6, 1))
+            results = benchmarks.run(options['scenarios'], repeat=options['repeat'], warmup=options['warmup'])
+            transaction.set_rollback(True)
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'dataset': dataset,
+            'repeat': options['repeat'],
+            'scenarios': results,
+        }
+        for name, result in results.items():
+            if 'time_ms' in result:
+                self.stdout.write(
+                    f"{name:<22} {result['time_ms']:>9.2f} ms  {result['queries']:>4} so'rov  "
+                    f"{result['peak_kb']:>9.1f} KB"
+                )
+            else:
+                self.stdout.write(self.style.WARNING(f"{name:<22} {result.get('skipped') or result.get('error')}"))
+
+        if options['output']:
+            self.write_json(options['output'], report)
+        if options['save_baseline']:
+            self.write_json(options['baseline'], report)
+            return
+        if options['baseline']:
+            self.check_baseline(options['baseline'], results, options['threshold'])
+
+    def write_json(self, path, report):
+        with open(path, 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Natijalar {path} fayliga yozildi."))
+
+    def check_baseline(self, path, results, threshold):
+        if not os.path.exists(path):
+            raise CommandError(f"Baseline fayli topilmadi: {path}")
+        with open(path) as f:
+            baseline = json.load(f)['scenarios']
+        regressions = benchmarks.compare(results, baseline, threshold)
+        for name, metric, before, after in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSIYA {name}: {metric} {before} -> {after}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} ta regressiya topildi")
+        self.stdout.write(self.style.SUCCESS("Regressiya yo'q."))
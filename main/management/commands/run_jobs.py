@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from main import jobs
+
+
+class Command(BaseCommand):
+    help = "Fon vazifalari navbatini bajaradi (Excel import va boshqalar)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Navbatdagi vazifalarni bajarib, chiqib ketish")
+        parser.add_argument('--sleep', type=float, default=2,
+                            help="Navbat bo'sh bo'lganda kutish vaqti (sekund)")
+        parser.add_argument('--stale-minutes', type=int, default=60,
+                            help="Shuncha daqiqadan beri jarayoni yangilanmagan 'running' vazifalar qayta navbatga qo'yiladi")
+
+    def handle(self, *args, **options):
+        jobs.discover()
+        stale = timedelta(minutes=options['stale_minutes'])
+
+        while True:
+            requeued = jobs.requeue_stale(stale)
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"{requeued} ta to'xtab qolgan vazifa qayta navbatga qo'yildi."))
+
+            count = jobs.run_pending()
+            if count:
+                self.stdout.write(self.style.SUCCESS(f"{count} ta vazifa bajarildi."))
+            if options['once']:
+                break
+            if not count:
+                time.sleep(options['sleep'])
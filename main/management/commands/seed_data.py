@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from main import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Sinov ma'lumotlarini yaratadi: shaharlar, binolar, uylar, mijozlar va bir necha yillik "
+        "to'lov jadvallari bor shartnomalar (main.seeding). Faqat sinov bazasida ishlating"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cities', type=int, default=2, help="Shaharlar soni")
+        parser.add_argument('--buildings', type=int, default=3, help="Har bir shahardagi binolar soni")
+        parser.add_argument('--homes', type=int, default=100, help="Har bir binodagi uylar soni")
+        parser.add_argument('--clients', type=int, default=500,
+                            help="Mijozlar soni (uylar yetgunicha har biri shartnoma oladi)")
+        parser.add_argument('--years', type=int, default=3, help="Shartnomalar necha yil ichida tuzilgan")
+        parser.add_argument('--paid-ratio', type=float, default=0.7,
+                            help="O'tgan oylarning to'langan ulushi (0..1)")
+        parser.add_argument('--seed', type=int, default=0, help="Tasodifiy sonlar generatori uchun boshlang'ich qiymat")
+
+    def handle(self, *args, **options):
+        counts = seeding.seed(
+            cities=options['cities'], buildings=options['buildings'], homes=options['homes'],
+            clients=options['clients'], years=options['years'], paid_ratio=options['paid_ratio'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['cities']} ta shahar, {counts['buildings']} ta bino, {counts['homes']} ta uy, "
+            f"{counts['clients']} ta mijoz, {counts['contracts']} ta shartnoma, "
+            f"{counts['installments']} ta to'lov oyi yaratildi."
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import reminders
+
+
+class Command(BaseCommand):
+    help = "Yaqinlashayotgan va muddati o'tgan to'lovlar uchun eslatma SMS larini navbatga qo'yadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="To'lov sanasiga shuncha kun qolganda eslatiladi (standart: REMINDER_DAYS_BEFORE)")
+        parser.add_argument('--batch-size', type=int, default=reminders.REMINDER_BATCH_SIZE,
+                            help="Bir blokda ko'riladigan oylar soni")
+        parser.add_argument('--loop', action='store_true',
+                            help="To'xtamasdan ishlash (har --interval sekundda tekshiradi)")
+        parser.add_argument('--interval', type=float, default=3600,
+                            help="--loop rejimida tekshiruvlar orasidagi vaqt (sekund)")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = reminders.send_reminders(days=options['days'], batch_size=options['batch_size'])
+            for kind, (installments, messages) in totals.items():
+                self.stdout.write(self.style.SUCCESS(f"{kind}: {installments} ta oy, {messages} ta SMS navbatga qo'yildi."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:59
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_occupancy(apps, schema_editor):
+    Building = apps.get_model('main', 'Building')
+    Home = apps.get_model('main', 'Home')
+    counts = {
+        row['building_id']: row
+        for row in Home.objects.order_by().values('building_id').annotate(
+            total=Count('id'),
+            busy=Count('id', filter=Q(home__busy=True)),
+        )
+    }
+    buildings = list(Building.objects.all())
+    for building in buildings:
+        row = counts.get(building.pk, {'total': 0, 'busy': 0})
+        building.homes_total = row['total']
+        building.homes_busy = row['busy']
+        building.homes_free = row['total'] - row['busy']
+    Building.objects.bulk_update(buildings, ['homes_total', 'homes_busy', 'homes_free'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='building',
+            name='homes_busy',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Band uylar'),
+        ),
+        migrations.AddField(
+            model_name='building',
+            name='homes_free',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Bo'sh uylar"),
+        ),
+        migrations.AddField(
+            model_name='building',
+            name='homes_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Jami uylar'),
+        ),
+        migrations.RunPython(fill_occupancy, migrations.RunPython.noop),
+    ]
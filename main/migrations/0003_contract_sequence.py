@@ -0,0 +1,52 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:08
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def fill_sequence(apps, schema_editor):
+    """
+    Takrorlangan shartnoma raqamlarini (eng birinchisidan boshqalarini)
+    yangi raqamlarga o'tkazadi va hisoblagichni eng katta raqamdan boshlaydi.
+    """
+    Client = apps.get_model('main', 'Client')
+    ContractSequence = apps.get_model('main', 'ContractSequence')
+
+    last_value = Client.objects.aggregate(Max('contract'))['contract__max'] or 0
+    duplicates = (
+        Client.objects.order_by().filter(contract__isnull=False)
+        .values('contract').annotate(total=Count('id')).filter(total__gt=1)
+        .values_list('contract', flat=True)
+    )
+    renumbered = []
+    for number in list(duplicates):
+        for contract in Client.objects.filter(contract=number).order_by('created', 'id')[1:]:
+            last_value += 1
+            contract.contract = last_value
+            renumbered.append(contract)
+    Client.objects.bulk_update(renumbered, ['contract'], batch_size=500)
+
+    ContractSequence.objects.update_or_create(name='contract', defaults={'last_value': last_value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_building_occupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Nomi')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='Oxirgi berilgan raqam')),
+            ],
+            options={
+                'verbose_name': 'Raqamlar ketma-ketligi',
+                'verbose_name_plural': 'Raqamlar ketma-ketliklari',
+            },
+        ),
+        migrations.RunPython(fill_sequence, migrations.RunPython.noop),
+    ]
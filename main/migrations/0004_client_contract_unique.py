@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_contract_sequence'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='contract',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True, verbose_name='Shartnoma raqami'),
+        ),
+    ]
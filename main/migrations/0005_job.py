@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_client_contract_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='Turi')),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('running', 'Bajarilmoqda'), ('done', 'Tugallangan'), ('failed', 'Xatolik')], default='pending', max_length=10, verbose_name='Holati')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Parametrlar')),
+                ('file', models.FileField(blank=True, null=True, upload_to='jobs/', verbose_name='Fayl')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Bajarilgan qatorlar')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Xato qatorlar')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Xatolar')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Natija')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan vaqti')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='Boshlangan vaqti')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Tugagan vaqti')),
+            ],
+            options={
+                'verbose_name': 'Fon vazifasi',
+                'verbose_name_plural': 'Fon vazifalari',
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['status', 'created'], name='main_job_status_bd60aa_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:14
+
+import main.storage
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    """Mavjud rasmlar uchun havolalar sonini hisoblaydi (eski nomlar o'zgarmaydi)."""
+    HomeInformation = apps.get_model('main', 'HomeInformation')
+    StoredBlob = apps.get_model('main', 'StoredBlob')
+    refs = Counter()
+    for field in ('floor_plan', 'floor_plan_drawing'):
+        names = HomeInformation.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        refs.update(names.values_list(field, flat=True).iterator())
+    StoredBlob.objects.bulk_create(
+        [StoredBlob(name=name, refs=count) for name, count in refs.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Fayl nomi')),
+                ('refs', models.IntegerField(default=0, verbose_name='Havolalar soni')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan vaqti')),
+            ],
+            options={
+                'verbose_name': 'Saqlangan fayl',
+                'verbose_name_plural': 'Saqlangan fayllar',
+            },
+        ),
+        migrations.AlterField(
+            model_name='homeinformation',
+            name='floor_plan',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.content_storage, upload_to='floor_plans/', verbose_name='Loyiha rasmi'),
+        ),
+        migrations.AlterField(
+            model_name='homeinformation',
+            name='floor_plan_drawing',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.content_storage, upload_to='floor_plan_drawings/', verbose_name='Chertoj rasmi'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
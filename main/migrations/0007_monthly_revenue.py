@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_content_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Oy')),
+                ('amount', models.BigIntegerField(default=0, verbose_name='Tushum')),
+                ('buildings', models.JSONField(blank=True, default=list, verbose_name='Binolar kesimida')),
+            ],
+            options={
+                'verbose_name': 'Oylik tushum',
+                'verbose_name_plural': 'Oylik tushumlar',
+                'ordering': ['month'],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Sum, Value, When
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    """Mavjud to'lovlardan kunlik tushumni yig'adi (main.rollups.ledger_totals bilan bir xil)."""
+    Rasrochka = apps.get_model('main', 'Rasrochka')
+    DailyRevenue = apps.get_model('main', 'DailyRevenue')
+    rows = (
+        Rasrochka.objects
+        .filter(amount_paid__gt=0, pay_date__isnull=False)
+        .annotate(
+            day=TruncDate('pay_date'),
+            kind=Case(When(month=0, then=Value('boshlangich')), default=Value('oylik')),
+        )
+        .order_by()
+        .values('day', 'client__home__building', 'kind')
+        .annotate(amount=Sum('amount_paid'))
+    )
+    DailyRevenue.objects.bulk_create([
+        DailyRevenue(day=row['day'], building_id=row['client__home__building'], kind=row['kind'], amount=row['amount'])
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_monthly_revenue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Kun')),
+                ('kind', models.CharField(choices=[('boshlangich', "Boshlang'ich to'lov"), ('oylik', "Oylik to'lov")], max_length=20, verbose_name="To'lov turi")),
+                ('amount', models.BigIntegerField(default=0, verbose_name='Tushum')),
+                ('building', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_revenue', to='main.building', verbose_name='Bino')),
+            ],
+            options={
+                'verbose_name': 'Kunlik tushum',
+                'verbose_name_plural': 'Kunlik tushumlar',
+                'ordering': ['day'],
+                'unique_together': {('day', 'building', 'kind')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_daily_revenue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(default='broadcast', max_length=20, verbose_name='Turi')),
+                ('text', models.TextField(blank=True, default='', verbose_name='Matn')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Qabul qiluvchilar soni')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan vaqti')),
+            ],
+            options={
+                'verbose_name': 'SMS yuborish',
+                'verbose_name_plural': 'SMS yuborishlar',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SmsMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(max_length=20, verbose_name='Telefon raqam')),
+                ('text', models.TextField(verbose_name='Matn')),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('sending', 'Yuborilmoqda'), ('sent', 'Yuborilgan'), ('failed', 'Xatolik')], default='pending', max_length=10, verbose_name='Holati')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Urinishlar soni')),
+                ('provider_status', models.PositiveIntegerField(blank=True, null=True, verbose_name='Provayder javob kodi')),
+                ('response', models.TextField(blank=True, default='', verbose_name='Provayder javobi')),
+                ('lease', models.CharField(blank=True, default='', max_length=32, verbose_name='Worker belgisi')),
+                ('claimed', models.DateTimeField(blank=True, null=True, verbose_name='Olingan vaqti')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Yuborilgan vaqti')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='main.smscampaign', verbose_name='Yuborish')),
+            ],
+            options={
+                'verbose_name': 'SMS xabar',
+                'verbose_name_plural': 'SMS xabarlar',
+                'indexes': [models.Index(fields=['status', 'id'], name='main_smsmes_status_1a1c67_idx')],
+                'unique_together': {('campaign', 'phone')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_sms_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('upcoming', "To'lov yaqinlashmoqda"), ('overdue', "To'lov muddati o'tgan")], max_length=10, verbose_name='Turi')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan vaqti')),
+            ],
+            options={
+                'verbose_name': "To'lov eslatmasi",
+                'verbose_name_plural': "To'lov eslatmalari",
+            },
+        ),
+        migrations.AddIndex(
+            model_name='rasrochka',
+            index=models.Index(condition=models.Q(('qoldiq__gt', 0)), fields=['date'], name='rasrochka_unpaid_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='paymentreminder',
+            name='campaign',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reminders', to='main.smscampaign', verbose_name='SMS yuborish'),
+        ),
+        migrations.AddField(
+            model_name='paymentreminder',
+            name='installment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='main.rasrochka', verbose_name="To'lov"),
+        ),
+        migrations.AlterUniqueTogether(
+            name='paymentreminder',
+            unique_together={('installment', 'kind')},
+        ),
+    ]
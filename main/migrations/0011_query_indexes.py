@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_payment_reminders'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['created'], name='client_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['status', 'created'], name='client_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['debt', 'created'], name='client_debt_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientinformation',
+            index=models.Index(fields=['created'], name='client_info_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['created'], name='expense_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='home',
+            index=models.Index(fields=['building', 'created'], name='home_building_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rasrochka',
+            index=models.Index(condition=models.Q(('qoldiq__gt', 0)), fields=['client', 'date'], name='rasrochka_client_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rasrochka',
+            index=models.Index(fields=['client', 'month'], name='rasrochka_client_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rasrochka',
+            index=models.Index(condition=models.Q(('amount_paid__gt', 0)), fields=['date'], name='rasrochka_paid_date_idx'),
+        ),
+    ]
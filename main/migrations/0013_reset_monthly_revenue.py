@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_monthly_revenue(apps, schema_editor):
+    # Saqlangan oylar to'lov sanasi bo'yicha hisoblangan edi: keyingi so'rovda
+    # shartnoma oyi bo'yicha qayta yig'iladi (main.revenue.refresh_rollup)
+    apps.get_model('main', 'MonthlyRevenue').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_monthly_revenue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_reset_monthly_revenue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='smsmessage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Navbatda'), ('sending', 'Yuborilmoqda'), ('sent', 'Yuborilgan'), ('failed', 'Xatolik'), ('unknown', "Noma'lum")], default='pending', max_length=10, verbose_name='Holati'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils import timezone
 
+from main.storage import content_storage
+
 class City(models.Model):
     name = models.CharField(max_length=100, verbose_name="Shahar nomi")
     created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
@@ -22,11 +24,26 @@ class Building(models.Model):
     floor = models.IntegerField(verbose_name="Qavatlar")
     status = models.BooleanField(verbose_name="Qo'shilgan", default=False)
     location = models.TextField(verbose_name="Bino joylashuvi", null=True, blank=True)
+    homes_total = models.PositiveIntegerField(default=0, editable=False, verbose_name="Jami uylar")
+    homes_busy = models.PositiveIntegerField(default=0, editable=False, verbose_name="Band uylar")
+    homes_free = models.PositiveIntegerField(default=0, editable=False, verbose_name="Bo'sh uylar")
     created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
     
 
+    OCCUPANCY_FIELDS = ('homes_total', 'homes_busy', 'homes_free')
+
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        # Hisoblagichlar faqat main.occupancy orqali (F() bilan) o'zgaradi -
+        # eskirgan obyektni saqlash ularni qayta yozib yubormasligi kerak
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.OCCUPANCY_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
     class Meta:
         verbose_name = "Bino"
@@ -43,11 +60,41 @@ class HomeInformation(models.Model):
     created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
     home_model_id = models.IntegerField(verbose_name="Home model ID", null=True)
     busy = models.BooleanField(verbose_name="Band", default=False)
-    floor_plan = models.ImageField(upload_to='floor_plans/', null=True, blank=True, verbose_name="Loyiha rasmi")
-    floor_plan_drawing = models.ImageField(upload_to='floor_plan_drawings/', null=True, blank=True, verbose_name="Chertoj rasmi")
+    floor_plan = models.ImageField(upload_to='floor_plans/', storage=content_storage, null=True, blank=True, verbose_name="Loyiha rasmi")
+    floor_plan_drawing = models.ImageField(upload_to='floor_plan_drawings/', storage=content_storage, null=True, blank=True, verbose_name="Chertoj rasmi")
+
+    FILE_FIELDS = ('floor_plan', 'floor_plan_drawing')
     
     def __str__(self):
         return f"{self.home_number} - uy, {self.padez_number} - padez"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Bazadagi holatni eslab qolamiz, busy o'zgarganini save() da aniqlash uchun
+        instance._loaded_busy = instance.__dict__.get('busy')
+        # Fayl nomlari - almashtirilgan/o'chirilgan rasmlarni main.blobs ga qaytarish uchun
+        instance._loaded_files = {
+            name: str(instance.__dict__[name] or '') for name in cls.FILE_FIELDS if name in instance.__dict__
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        from main.occupancy import adjust_occupancy, rebuild_occupancy
+
+        busy = self._meta.get_field('busy').to_python(self.busy)
+        loaded_busy = getattr(self, '_loaded_busy', None)
+        existing = self.pk is not None and not self._state.adding
+
+        super().save(*args, **kwargs)
+
+        # Uy binoga biriktirilgan bo'lsa, bino hisoblagichlarini yangilash
+        if existing and loaded_busy is None:
+            rebuild_occupancy(self.home_instances.values_list('building_id', flat=True))
+        elif existing and busy != loaded_busy:
+            delta = 1 if busy else -1
+            adjust_occupancy(self.home_instances.values_list('building_id', flat=True), busy=delta)
+        self._loaded_busy = busy
     
     class Meta:
         verbose_name = "Uy ma'lumoti"
@@ -61,12 +108,22 @@ class Home(models.Model):
     
     def __str__(self):
         return f"{self.building.name} - {self.home.home_number}"
+
+    def save(self, *args, **kwargs):
+        from main.occupancy import adjust_occupancy
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            adjust_occupancy([self.building_id], total=1, busy=1 if self.home.busy else 0)
     
     class Meta:
         verbose_name = "Uy"
         verbose_name_plural = "Uylar"
         ordering = ['-created']
         unique_together = ['building', 'home']
+        # Bino uylari ro'yxati (-created); band/bo'sh filtri HomeInformation.busy orqali
+        indexes = [models.Index(fields=['building', 'created'], name='home_building_created_idx')]
 
 class ClientInformation(models.Model):
     full_name = models.CharField(max_length=150, verbose_name="To'liq ism")
@@ -88,6 +145,7 @@ class ClientInformation(models.Model):
         verbose_name = "Mijoz ma'lumoti"
         verbose_name_plural = "Mijoz ma'lumotlari"
         ordering = ['-created']
+        indexes = [models.Index(fields=['created'], name='client_info_created_idx')]
 
 class Client(models.Model):
     """Shartnoma"""
@@ -99,7 +157,7 @@ class Client(models.Model):
     ]
     
     client = models.ForeignKey(to=ClientInformation, on_delete=models.SET_NULL, null=True, verbose_name="Mijoz", related_name="contracts")
-    contract = models.PositiveIntegerField(verbose_name="Shartnoma raqami", null=True, blank=True)
+    contract = models.PositiveIntegerField(verbose_name="Shartnoma raqami", null=True, blank=True, unique=True)
     home = models.ForeignKey(to=Home, on_delete=models.SET_NULL, null=True, verbose_name="Uy", related_name="contracts")
     passport = models.CharField(max_length=15, verbose_name="Passport")
     passport_muddat = models.CharField(max_length=25, verbose_name="Berilgan vaqti", null=True)
@@ -125,6 +183,12 @@ class Client(models.Model):
         verbose_name = "Shartnoma"
         verbose_name_plural = "Shartnomalar"
         ordering = ['-created']
+        indexes = [
+            # Ro'yxat (-created), holat va qarzdorlik filtrlari bilan, statistika sana oralig'i
+            models.Index(fields=['created'], name='client_created_idx'),
+            models.Index(fields=['status', 'created'], name='client_status_created_idx'),
+            models.Index(fields=['debt', 'created'], name='client_debt_created_idx'),
+        ]
         
     def save(self, *args, **kwargs):
         # Shartnoma yaratilganda, uyni band qilish
@@ -135,6 +199,18 @@ class Client(models.Model):
                 
         super().save(*args, **kwargs)
 
+class ContractSequence(models.Model):
+    """Shartnoma raqamlari hisoblagichi (main.sequences orqali ishlatiladi)"""
+    name = models.CharField(max_length=50, unique=True, verbose_name="Nomi")
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name="Oxirgi berilgan raqam")
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+    class Meta:
+        verbose_name = "Raqamlar ketma-ketligi"
+        verbose_name_plural = "Raqamlar ketma-ketliklari"
+
 class Rasrochka(models.Model):
     client = models.ForeignKey(to=Client, on_delete=models.CASCADE, null=True, verbose_name="Mijoz", related_name="payments")
     month = models.IntegerField(verbose_name="Oy raqami")
@@ -144,6 +220,17 @@ class Rasrochka(models.Model):
     pay_date = models.DateTimeField(verbose_name="O'xirgi to'lov sanasi", null=True, blank=True)
     date = models.DateTimeField(verbose_name="To'lov sanasi")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Sana o'zgarsa eski oy tushumi ham qayta hisoblanishi kerak (main.revenue)
+        instance._loaded_date = instance.__dict__.get('date')
+        # Kunlik tushumdagi hissasi (main.rollups.snapshot bilan bir xil tartibda)
+        instance._loaded_rollup = (
+            instance.__dict__.get('pay_date'), instance.__dict__.get('month'), instance.__dict__.get('amount_paid'),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
         self.qoldiq = self.amount - self.amount_paid
         if not self.pay_date and self.amount_paid > 0:
@@ -157,6 +244,16 @@ class Rasrochka(models.Model):
         verbose_name = "To'lov"
         verbose_name_plural = "To'lovlar"
         ordering = ['client', 'month']
+        indexes = [
+            # Eslatmalar (main.reminders) to'lanmagan oylarni sana oralig'i bo'yicha qidiradi
+            models.Index(fields=['date'], condition=models.Q(qoldiq__gt=0), name='rasrochka_unpaid_date_idx'),
+            # Shartnomaning to'lanmagan oylari sana tartibida (to'lov taqsimlash, qarz subquerylari)
+            models.Index(fields=['client', 'date'], condition=models.Q(qoldiq__gt=0), name='rasrochka_client_unpaid_idx'),
+            # Jadval oylar tartibida (ordering) va month bo'yicha filtrlar
+            models.Index(fields=['client', 'month'], name='rasrochka_client_month_idx'),
+            # Tushum hisobotlari: to'lov sanasi oralig'idagi to'langan oylar (main.revenue, statistika)
+            models.Index(fields=['date'], condition=models.Q(amount_paid__gt=0), name='rasrochka_paid_date_idx'),
+        ]
 
 class ClientTrash(models.Model):
     client = models.ForeignKey(to=ClientInformation, on_delete=models.SET_NULL, null=True, verbose_name="Mijoz")
@@ -209,6 +306,7 @@ class Expense(models.Model):
         verbose_name = "Chiqim"
         verbose_name_plural = "Chiqimlar"
         ordering = ['-created']
+        indexes = [models.Index(fields=['created'], name='expense_created_idx')]
 
     def __str__(self):
         return f"{self.expense_type.name} - {self.amount:,} so'm"
@@ -229,4 +327,157 @@ class BotUser(models.Model):
     
     class Meta:
         verbose_name = "Bot Foydalanuvchisi"
-        verbose_name_plural = "Bot Foydalanuvchilari"
\ No newline at end of file
+        verbose_name_plural = "Bot Foydalanuvchilari"
+
+
+class StoredBlob(models.Model):
+    """Tarkib bo'yicha saqlangan fayl va unga ishora qiluvchi yozuvlar soni (main.blobs)"""
+    name = models.CharField(max_length=255, unique=True, verbose_name="Fayl nomi")
+    refs = models.IntegerField(default=0, verbose_name="Havolalar soni")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
+
+    def __str__(self):
+        return f"{self.name} ({self.refs})"
+
+    class Meta:
+        verbose_name = "Saqlangan fayl"
+        verbose_name_plural = "Saqlangan fayllar"
+
+
+class Job(models.Model):
+    """Fon vazifasi (main.jobs navbati, run_jobs buyrug'i bajaradi)"""
+    STATUS_CHOICES = [
+        ('pending', 'Navbatda'),
+        ('running', 'Bajarilmoqda'),
+        ('done', 'Tugallangan'),
+        ('failed', 'Xatolik'),
+    ]
+
+    kind = models.CharField(max_length=50, verbose_name="Turi")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Holati")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Parametrlar")
+    file = models.FileField(upload_to='jobs/', null=True, blank=True, verbose_name="Fayl")
+    processed = models.PositiveIntegerField(default=0, verbose_name="Bajarilgan qatorlar")
+    failed = models.PositiveIntegerField(default=0, verbose_name="Xato qatorlar")
+    errors = models.JSONField(default=list, blank=True, verbose_name="Xatolar")
+    result = models.JSONField(null=True, blank=True, verbose_name="Natija")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
+    started = models.DateTimeField(null=True, blank=True, verbose_name="Boshlangan vaqti")
+    finished = models.DateTimeField(null=True, blank=True, verbose_name="Tugagan vaqti")
+    # Worker tirikligi: olinganda va har bir report_progress da yangilanadi (main.jobs.requeue_stale)
+    heartbeat = models.DateTimeField(null=True, blank=True, verbose_name="Oxirgi faollik vaqti")
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    class Meta:
+        verbose_name = "Fon vazifasi"
+        verbose_name_plural = "Fon vazifalari"
+        ordering = ['-created']
+        indexes = [models.Index(fields=['status', 'created'])]
+
+
+
+class MonthlyRevenue(models.Model):
+    """Yopilgan oy tushumi (main.revenue hisoblaydi): umumiy va bino kesimida"""
+    month = models.DateField(unique=True, verbose_name="Oy")
+    amount = models.BigIntegerField(default=0, verbose_name="Tushum")
+    buildings = models.JSONField(default=list, blank=True, verbose_name="Binolar kesimida")
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.amount:,} so'm"
+
+    class Meta:
+        verbose_name = "Oylik tushum"
+        verbose_name_plural = "Oylik tushumlar"
+        ordering = ['month']
+
+
+class DailyRevenue(models.Model):
+    """Kunlik tushum bino va to'lov turi kesimida (main.rollups yangilaydi)"""
+    KIND_CHOICES = [
+        ('boshlangich', "Boshlang'ich to'lov"),
+        ('oylik', "Oylik to'lov"),
+    ]
+
+    day = models.DateField(verbose_name="Kun")
+    building = models.ForeignKey(Building, on_delete=models.SET_NULL, null=True, blank=True, related_name="daily_revenue", verbose_name="Bino")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="To'lov turi")
+    amount = models.BigIntegerField(default=0, verbose_name="Tushum")
+
+    def __str__(self):
+        return f"{self.day}: {self.amount:,} so'm"
+
+    class Meta:
+        verbose_name = "Kunlik tushum"
+        verbose_name_plural = "Kunlik tushumlar"
+        ordering = ['day']
+        unique_together = ['day', 'building', 'kind']
+
+
+class SmsCampaign(models.Model):
+    """Bitta yuborish (ommaviy SMS yoki eslatmalar) - SmsMessage lar guruhi"""
+    kind = models.CharField(max_length=20, default='broadcast', verbose_name="Turi")
+    text = models.TextField(blank=True, default='', verbose_name="Matn")
+    total = models.PositiveIntegerField(default=0, verbose_name="Qabul qiluvchilar soni")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.total})"
+
+    class Meta:
+        verbose_name = "SMS yuborish"
+        verbose_name_plural = "SMS yuborishlar"
+        ordering = ['-created']
+
+
+class SmsMessage(models.Model):
+    """Yuboriladigan SMS (main.outbox navbati) va uning yetkazilish natijasi"""
+    STATUS_CHOICES = [
+        ('pending', 'Navbatda'),
+        ('sending', 'Yuborilmoqda'),
+        ('sent', 'Yuborilgan'),
+        ('failed', 'Xatolik'),
+        ('unknown', "Noma'lum"),
+    ]
+
+    campaign = models.ForeignKey(SmsCampaign, on_delete=models.CASCADE, related_name="messages", verbose_name="Yuborish")
+    phone = models.CharField(max_length=20, verbose_name="Telefon raqam")
+    text = models.TextField(verbose_name="Matn")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Holati")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Urinishlar soni")
+    provider_status = models.PositiveIntegerField(null=True, blank=True, verbose_name="Provayder javob kodi")
+    response = models.TextField(blank=True, default='', verbose_name="Provayder javobi")
+    lease = models.CharField(max_length=32, blank=True, default='', verbose_name="Worker belgisi")
+    claimed = models.DateTimeField(null=True, blank=True, verbose_name="Olingan vaqti")
+    sent = models.DateTimeField(null=True, blank=True, verbose_name="Yuborilgan vaqti")
+
+    def __str__(self):
+        return f"{self.phone} ({self.status})"
+
+    class Meta:
+        verbose_name = "SMS xabar"
+        verbose_name_plural = "SMS xabarlar"
+        unique_together = ['campaign', 'phone']
+        indexes = [models.Index(fields=['status', 'id'])]
+
+
+class PaymentReminder(models.Model):
+    """To'lov eslatmasi yuborilgani - har bir oy uchun har bir turdagi eslatma bir marta (main.reminders)"""
+    KIND_CHOICES = [
+        ('upcoming', "To'lov yaqinlashmoqda"),
+        ('overdue', "To'lov muddati o'tgan"),
+    ]
+
+    installment = models.ForeignKey(Rasrochka, on_delete=models.CASCADE, related_name="reminders", verbose_name="To'lov")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Turi")
+    campaign = models.ForeignKey(SmsCampaign, on_delete=models.SET_NULL, null=True, blank=True, related_name="reminders", verbose_name="SMS yuborish")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan vaqti")
+
+    def __str__(self):
+        return f"{self.installment} - {self.kind}"
+
+    class Meta:
+        verbose_name = "To'lov eslatmasi"
+        verbose_name_plural = "To'lov eslatmalari"
+        unique_together = ['installment', 'kind']
@@ -0,0 +1,48 @@
+from django.db.models import Count, F, Q
+
+from main.models import Building, Home
+
+
+def adjust_occupancy(building_ids, total=0, busy=0):
+    """
+    Bino hisoblagichlarini bitta UPDATE bilan o'zgartiradi (F() orqali).
+    """
+    if not total and not busy:
+        return
+    Building.objects.filter(pk__in=building_ids).update(
+        homes_total=F('homes_total') + total,
+        homes_busy=F('homes_busy') + busy,
+        homes_free=F('homes_free') + (total - busy),
+    )
+
+
+def rebuild_occupancy(building_ids=None):
+    """
+    Hisoblagichlarni Home jadvalidan qaytadan hisoblaydi.
+    building_ids berilmasa barcha binolar qayta hisoblanadi.
+    """
+    homes = Home.objects.order_by()
+    buildings = Building.objects.order_by()
+    if building_ids is not None:
+        building_ids = list(building_ids)
+        homes = homes.filter(building_id__in=building_ids)
+        buildings = buildings.filter(pk__in=building_ids)
+
+    counts = {
+        row['building_id']: row
+        for row in homes.values('building_id').annotate(
+            total=Count('id'),
+            busy=Count('id', filter=Q(home__busy=True)),
+        )
+    }
+
+    changed = []
+    for building in buildings.only('id', 'homes_total', 'homes_busy', 'homes_free'):
+        row = counts.get(building.pk, {'total': 0, 'busy': 0})
+        values = (row['total'], row['busy'], row['total'] - row['busy'])
+        if values != (building.homes_total, building.homes_busy, building.homes_free):
+            building.homes_total, building.homes_busy, building.homes_free = values
+            changed.append(building)
+
+    Building.objects.bulk_update(changed, ['homes_total', 'homes_busy', 'homes_free'], batch_size=500)
+    return len(changed)
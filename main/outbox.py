@@ -0,0 +1,134 @@
+"""
+SMS navbati (SmsMessage jadvali).
+
+Yuborish so'rovi faqat navbatga yozadi: SmsCampaign va uning barcha
+xabarlari bitta bulk INSERT bilan qo'shiladi. drain() navbatni
+SMS_BATCH_SIZE talik bloklar bilan bo'shatadi: blok pending -> sending
+shartli UPDATE bilan olinadi (bir nechta worker bitta xabarni olmaydi),
+main.sms.SmsSender bilan yuboriladi va har bir xabarning holati, urinishlar
+soni va provayder javobi bitta bulk_update bilan yoziladi. Yuborilgan
+xabar qayta olinmaydi, bitta yuborishda bir raqam faqat bir marta bo'ladi.
+
+Yetkazish ko'pi bilan bir marta: worker blokni yuborib, natijani yozishga
+ulgurmasdan to'xtasa, provayder xabarni qabul qilgan-qilmagani noma'lum.
+Bunday xabarlar (expire_stale) qayta navbatga qo'yilmaydi, balki 'unknown'
+holatiga o'tadi - mijozga takror SMS bormaydi. Ularni qayta yuborish
+qarorini operator qabul qiladi (retry_failed(..., unknown=True)).
+"""
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from main.models import SmsCampaign, SmsMessage
+from main.sms import SmsSender
+
+SMS_BATCH_SIZE = 500
+# Shuncha vaqtdan beri 'sending' turgan xabarning workeri to'xtagan deb hisoblanadi
+STALE_AFTER = timedelta(minutes=30)
+
+
+def enqueue(messages, kind='broadcast', text=''):
+    """
+    messages - (telefon, matn) juftliklari. Takroriy raqamlar tashlab
+    yuboriladi. Yangi SmsCampaign qaytadi.
+    """
+    unique = {}
+    for phone, body in messages:
+        if phone and phone not in unique:
+            unique[phone] = body
+    with transaction.atomic():
+        campaign = SmsCampaign.objects.create(kind=kind, text=text, total=len(unique))
+        SmsMessage.objects.bulk_create(
+            [SmsMessage(campaign=campaign, phone=phone, text=body) for phone, body in unique.items()]
+        )
+    return campaign
+
+
+def enqueue_broadcast(text, phones, kind='broadcast'):
+    return enqueue(((phone, text) for phone in phones), kind=kind, text=text)
+
+
+def claim_batch(limit=SMS_BATCH_SIZE):
+    """Navbatdagi eng eski limit ta xabarni shu worker nomiga oladi."""
+    ids = list(SmsMessage.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+    lease = uuid.uuid4().hex
+    SmsMessage.objects.filter(pk__in=ids, status='pending').update(
+        status='sending', lease=lease, claimed=timezone.now(),
+    )
+    return list(SmsMessage.objects.filter(pk__in=ids, lease=lease, status='sending').order_by('id'))
+
+
+def deliver(messages, sender):
+    """Xabarlarni yuboradi va natijani yozadi. (yuborilgan, xato) soni qaytadi."""
+    results = sender.send((message.phone, message.text) for message in messages)
+    now = timezone.now()
+    sent = 0
+    for message, result in zip(messages, results):
+        message.status = 'sent' if result['ok'] else 'failed'
+        message.attempts += result['attempts']
+        message.provider_status = result['status']
+        message.response = result['response'][:2000]
+        message.sent = now if result['ok'] else None
+        sent += result['ok']
+    SmsMessage.objects.bulk_update(
+        messages, ['status', 'attempts', 'provider_status', 'response', 'sent'], batch_size=SMS_BATCH_SIZE,
+    )
+    return sent, len(messages) - sent
+
+
+def drain(batch_size=SMS_BATCH_SIZE, sender=None, progress=None):
+    """
+    Navbat bo'shaguncha yuboradi. Har bir blokdan keyin
+    progress(yuborilgan, xato) chaqiriladi. (yuborilgan, xato) qaytadi.
+    """
+    sender = sender or SmsSender()
+    sent = failed = 0
+    while True:
+        messages = claim_batch(batch_size)
+        if not messages:
+            break
+        batch_sent, batch_failed = deliver(messages, sender)
+        sent += batch_sent
+        failed += batch_failed
+        if progress is not None:
+            progress(sent, failed)
+    return sent, failed
+
+
+def retry_failed(campaign, unknown=False):
+    """
+    Campaign dagi xato bergan xabarlarni qayta navbatga qo'yadi (yuborilganlari
+    tegilmaydi). unknown=True bo'lsa holati noma'lumlari ham - ular allaqachon
+    yetkazilgan bo'lishi mumkin.
+    """
+    statuses = ['failed', 'unknown'] if unknown else ['failed']
+    return SmsMessage.objects.filter(campaign=campaign, status__in=statuses).update(status='pending', lease='')
+
+
+def expire_stale(older_than=STALE_AFTER):
+    """
+    Worker to'xtab qolgan (older_than dan beri sending) xabarlarni 'unknown'
+    holatiga o'tkazadi: ular provayderga yetib borgan bo'lishi mumkin, shuning
+    uchun avtomatik qayta yuborilmaydi.
+    """
+    return SmsMessage.objects.filter(status='sending', claimed__lt=timezone.now() - older_than).update(
+        status='unknown', lease='', response="Worker to'xtadi: yetkazilgani noma'lum",
+    )
+
+
+def campaign_summary(campaign):
+    counts = dict.fromkeys(dict(SmsMessage.STATUS_CHOICES), 0)
+    rows = SmsMessage.objects.filter(campaign=campaign).order_by().values('status').annotate(count=Count('id'))
+    counts.update({row['status']: row['count'] for row in rows})
+    return {
+        'id': campaign.pk,
+        'kind': campaign.kind,
+        'total': campaign.total,
+        'created': campaign.created,
+        'statuses': counts,
+    }
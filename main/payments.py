@@ -0,0 +1,23 @@
+def allocate_payment(installments, amount, paid_at):
+    """
+    To'lovni to'lanmagan oylar bo'yicha (berilgan tartibda) taqsimlaydi.
+
+    installments - Rasrochka obyektlari; ular xotirada o'zgartiriladi, bazaga
+    yozish chaqiruvchining ishi (bitta bulk_update). (oy, tushgan summa)
+    juftliklari ro'yxati va taqsimlanmay qolgan summa qaytadi.
+    """
+    remaining = amount
+    allocations = []
+    for installment in installments:
+        if remaining <= 0:
+            break
+        if installment.qoldiq <= 0:
+            continue
+
+        paid = min(remaining, installment.qoldiq)
+        installment.amount_paid += paid
+        installment.qoldiq = installment.amount - installment.amount_paid
+        installment.pay_date = paid_at
+        remaining -= paid
+        allocations.append((installment, paid))
+    return allocations, remaining
@@ -0,0 +1,134 @@
+"""
+To'lov eslatmalari.
+
+Ikki turdagi eslatma bor: 'upcoming' - to'lov sanasiga REMINDER_DAYS_BEFORE
+kun yoki kamroq qolgan, 'overdue' - sanasi o'tgan va qoldig'i bor oylar.
+Oylar Rasrochka.date bo'yicha (qoldiq > 0 qismiy indeksi) sana oralig'i
+bilan qidiriladi va PaymentReminder da yozuvi borlari tashlab yuboriladi,
+shuning uchun har bir oy har bir eslatmani ko'pi bilan bir marta oladi.
+Topilganlar telefon va shartnoma tartibida taxminan REMINDER_BATCH_SIZE
+talik bloklarga bo'linadi - blok faqat telefon chegarasida kesiladi
+(next_batch), shartnoma bo'yicha guruhlanadi va main.outbox navbatiga
+qo'yiladi: bitta ishga tushirishda bitta telefonga bitta SMS.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from main import jobs, outbox
+from main.dates import day_start
+from main.models import PaymentReminder, Rasrochka
+
+REMINDER_BATCH_SIZE = 1000
+
+KIND_UPCOMING = 'upcoming'
+KIND_OVERDUE = 'overdue'
+
+TEXTS = {
+    KIND_UPCOMING: (
+        "Hurmatli {name}! {contract}-sonli shartnoma bo'yicha {date} sanasigacha "
+        "{amount} so'm to'lov qilishingiz kerak."
+    ),
+    KIND_OVERDUE: (
+        "Hurmatli {name}! {contract}-sonli shartnoma bo'yicha {date} sanasidagi "
+        "{amount} so'm to'lov muddati o'tgan. Iltimos, to'lovni amalga oshiring."
+    ),
+}
+
+
+def due_installments(kind, today, days):
+    """Eslatma yuborilmagan, to'lanmagan oylar (faqat rasmiylashtirilgan shartnomalar)."""
+    installments = Rasrochka.objects.filter(qoldiq__gt=0, month__gt=0, client__status='Rasmiylashtirilgan')
+    if kind == KIND_UPCOMING:
+        installments = installments.filter(
+            date__gte=day_start(today), date__lt=day_start(today + timedelta(days=days + 1)),
+        )
+    else:
+        installments = installments.filter(date__lt=day_start(today))
+    reminded = PaymentReminder.objects.filter(installment=OuterRef('pk'), kind=kind)
+    return installments.exclude(Exists(reminded))
+
+
+def build_messages(kind, rows):
+    """
+    Blokdagi oylarni shartnoma bo'yicha guruhlaydi: eng yaqin sana va
+    umumiy qoldiq. Bitta telefonning bir nechta shartnomasi bitta SMS bo'ladi.
+    """
+    contracts = {}
+    for row in rows:
+        contract = contracts.setdefault(row['client_id'], {
+            'phone': row['client__client__phone'],
+            'name': row['client__client__full_name'],
+            'contract': row['client__contract'],
+            'date': row['date'],
+            'amount': 0,
+        })
+        contract['date'] = min(contract['date'], row['date'])
+        contract['amount'] += row['qoldiq']
+
+    texts = {}
+    for contract in contracts.values():
+        if not contract['phone']:
+            continue
+        texts.setdefault(contract['phone'], []).append(TEXTS[kind].format(
+            name=contract['name'],
+            contract=contract['contract'],
+            date=timezone.localtime(contract['date']).strftime('%d.%m.%Y'),
+            amount=f"{contract['amount']:,}",
+        ))
+    return [(phone, "\n".join(lines)) for phone, lines in texts.items()]
+
+
+def next_batch(installments, batch_size):
+    """
+    Navbatdagi blok. batch_size ta qatordan keyin oxirgi telefonning (telefon
+    bo'lmasa - shartnomaning) qolgan oylari ham shu blokka qo'shiladi, aks
+    holda mijoz bir nechta qisman summali SMS olardi.
+    """
+    rows = list(installments[:batch_size])
+    if len(rows) < batch_size:
+        return rows
+    last = rows[-1]
+    if last['client__client__phone']:
+        field, value = 'client__client__phone', last['client__client__phone']
+    else:
+        field, value = 'client_id', last['client_id']
+    return [row for row in rows if row[field] != value] + list(installments.filter(**{field: value}))
+
+
+def send_reminders(today=None, days=None, batch_size=REMINDER_BATCH_SIZE):
+    """
+    Ikkala turdagi eslatmalarni navbatga qo'yadi.
+    {tur: (oylar soni, SMS soni)} qaytadi.
+    """
+    today = today or timezone.localdate()
+    days = getattr(settings, 'REMINDER_DAYS_BEFORE', 3) if days is None else days
+    totals = {}
+    for kind in (KIND_UPCOMING, KIND_OVERDUE):
+        installments = due_installments(kind, today, days).order_by('client__client__phone', 'client_id', 'date', 'id').values(
+            'id', 'client_id', 'date', 'qoldiq',
+            'client__contract', 'client__client__full_name', 'client__client__phone',
+        )
+        reminded = messages = 0
+        while True:
+            rows = next_batch(installments, batch_size)
+            if not rows:
+                break
+            with transaction.atomic():
+                pending = build_messages(kind, rows)
+                campaign = outbox.enqueue(pending, kind='reminder') if pending else None
+                # Telefonsiz shartnomalar oylari ham belgilanadi - keyingi blokda qayta chiqmasin
+                PaymentReminder.objects.bulk_create(
+                    [PaymentReminder(installment_id=row['id'], kind=kind, campaign=campaign) for row in rows],
+                    ignore_conflicts=True,
+                )
+            reminded += len(rows)
+            messages += len(pending)
+        totals[kind] = (reminded, messages)
+
+    if any(messages for _, messages in totals.values()):
+        jobs.enqueue('sms')
+    return totals
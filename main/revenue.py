@@ -0,0 +1,158 @@
+"""
+Oylik tushum.
+
+Oy tushumi - shu oyda tuzilgan shartnomalarning to'lov sanasi
+(Rasrochka.date) ham shu oyga tushgan to'lovlari amount_paid yig'indisi
+(avvalgi hisobot ma'nosi). Oylar bitta TruncMonth bo'yicha guruhlangan
+so'rov bilan hisoblanadi. Yopilgan (joriy oydan oldingi) oylar natijasi
+MonthlyRevenue jadvalida saqlanadi va qayta hisoblanmaydi: to'lovlar
+o'zgarganda shu oylar jadvaldan o'chiriladi (invalidate_months) va keyingi
+so'rovda qayta yig'iladi. Joriy oy har doim bazadan hisoblanadi.
+"""
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DateField, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from main.dates import day_start
+from main.models import Building, MonthlyRevenue, Rasrochka
+
+MONTH_NAMES = [
+    "Yanvar", "Fevral", "Mart", "Aprel", "May", "Iyun",
+    "Iyul", "Avgust", "Sentabr", "Oktabr", "Noyabr", "Dekabr",
+]
+
+
+def revenue_start():
+    return getattr(settings, 'REVENUE_START', date(2024, 10, 1))
+
+
+def month_start(value):
+    """datetime (mahalliy vaqt bo'yicha) yoki date tushgan oyning birinchi kuni."""
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def month_range(start, end):
+    """start dan end gacha (end kirmaydi) oylar."""
+    months = []
+    while start < end:
+        months.append(start)
+        start = next_month(start)
+    return months
+
+
+def month_label(month):
+    return f"{MONTH_NAMES[month.month - 1]} {month.year}-yil"
+
+
+def revenue_by_building(start, end):
+    """
+    [start, end) oylari uchun {oy: {bino_id: tushum}} - bitta guruhlangan so'rov.
+    Uysiz shartnomalar tushumi None kalitida.
+    """
+    rows = (
+        Rasrochka.objects
+        .filter(
+            date__gte=day_start(start), date__lt=day_start(end), amount_paid__gt=0,
+            client__created__gte=day_start(start), client__created__lt=day_start(end),
+        )
+        .annotate(
+            revenue_month=TruncMonth('date', output_field=DateField()),
+            contract_month=TruncMonth('client__created', output_field=DateField()),
+        )
+        .filter(contract_month=F('revenue_month'))
+        .order_by()
+        .values('revenue_month', 'client__home__building')
+        .annotate(amount=Sum('amount_paid'))
+    )
+    months = {}
+    for row in rows:
+        months.setdefault(row['revenue_month'], {})[row['client__home__building']] = row['amount']
+    return months
+
+
+def refresh_rollup(until):
+    """
+    until dan oldingi oylardan MonthlyRevenue da yo'qlarini hisoblab yozadi.
+    {oy: {bino_id: tushum}} qaytaradi.
+    """
+    stored = {
+        row.month: {building: amount for building, amount in row.buildings}
+        for row in MonthlyRevenue.objects.filter(month__gte=revenue_start(), month__lt=until)
+    }
+    missing = [month for month in month_range(revenue_start(), until) if month not in stored]
+    if missing:
+        computed = revenue_by_building(missing[0], next_month(missing[-1]))
+        rows = []
+        for month in missing:
+            buildings = computed.get(month, {})
+            stored[month] = buildings
+            rows.append(MonthlyRevenue(
+                month=month,
+                amount=sum(buildings.values()),
+                buildings=sorted(buildings.items(), key=lambda item: item[0] or 0),
+            ))
+        # Parallel so'rov shu oylarni allaqachon yozgan bo'lishi mumkin
+        MonthlyRevenue.objects.bulk_create(rows, ignore_conflicts=True)
+    return stored
+
+
+def monthly_revenue():
+    """
+    revenue_start() dan joriy oygacha [(oy, {bino_id: tushum}), ...].
+    Yopilgan oylar MonthlyRevenue dan, joriy oy bazadan olinadi.
+    """
+    current = month_start(timezone.now())
+    months = refresh_rollup(current)
+    months[current] = revenue_by_building(current, next_month(current)).get(current, {})
+    return [(month, months[month]) for month in month_range(revenue_start(), next_month(current))]
+
+
+def revenue_rows(group_by=None):
+    """
+    Hisobot qatorlari: (oy, tushum) yoki group_by='building'/'city' bo'lsa
+    (oy, bino/shahar nomi, tushum) - faqat tushumi bor guruhlar.
+    """
+    months = monthly_revenue()
+    if group_by is None:
+        return [(month, sum(buildings.values())) for month, buildings in months]
+
+    ids = {building for _, buildings in months for building in buildings if building is not None}
+    names = {
+        building.pk: building.city.name if group_by == 'city' else building.name
+        for building in Building.objects.filter(pk__in=ids).select_related('city')
+    }
+    rows = []
+    for month, buildings in months:
+        totals = {}
+        for building, amount in buildings.items():
+            name = names.get(building, "Noma'lum")
+            totals[name] = totals.get(name, 0) + amount
+        rows.extend((month, name, amount) for name, amount in sorted(totals.items()))
+    return rows
+
+
+def invalidate_months(values):
+    """
+    values (datetime/date) tushgan yopilgan oylarning saqlangan natijasini
+    tranzaksiya tugagach o'chiradi.
+    """
+    current = month_start(timezone.now())
+    months = {month_start(value) for value in values if value is not None}
+    months = [month for month in months if month < current]
+    if months:
+        transaction.on_commit(lambda: MonthlyRevenue.objects.filter(month__in=months).delete())
+
+
+def invalidate_contract(contract):
+    """Shartnomaning barcha to'lovlari tushgan oylar (masalan, uy o'zgarganda)."""
+    invalidate_months(Rasrochka.objects.filter(client=contract, amount_paid__gt=0).values_list('date', flat=True))
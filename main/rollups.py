@@ -0,0 +1,166 @@
+"""
+Kunlik tushum jadvali (DailyRevenue).
+
+To'lovning hissasi - amount_paid, oxirgi to'lov kuni (pay_date, mahalliy
+vaqt), shartnoma uyi joylashgan bino va to'lov turi (0-oy - boshlang'ich,
+qolganlari - oylik) kaliti bo'yicha. To'lov yozilganda eski hissa ayiriladi,
+yangisi qo'shiladi - o'sha tranzaksiyaning ichida, F() bilan. save()/delete()
+uchun buni main.signals qiladi, bulk_create/bulk_update dan keyin esa
+apply_payments ni chaqiruvchi o'zi chaqiradi. Jadvalni noldan tiklash:
+manage.py rebuild_revenue.
+
+main.revenue dan farqi: u oylarni to'lov sanasi (date) bo'yicha yig'adi,
+bu yerda esa pul qachon tushgani (pay_date) hisobga olinadi.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from main.models import Client, DailyRevenue, Rasrochka
+
+KIND_ADVANCE = 'boshlangich'
+KIND_MONTHLY = 'oylik'
+
+GROUP_FIELDS = ('day', 'building', 'kind')
+
+
+def payment_kind(month):
+    return KIND_ADVANCE if month == 0 else KIND_MONTHLY
+
+
+def snapshot(payment):
+    """To'lovning jadvalga ta'sir qiluvchi maydonlari (main.models.Rasrochka.from_db eslab qoladi)."""
+    return (payment.pay_date, payment.month, payment.amount_paid)
+
+
+def _contribution(state, building_id):
+    pay_date, month, amount_paid = state
+    if not amount_paid or pay_date is None:
+        return None
+    return (timezone.localtime(pay_date).date(), building_id, payment_kind(month)), amount_paid
+
+
+def contract_building(contract_id):
+    return Client.objects.filter(pk=contract_id).values_list('home__building', flat=True).first()
+
+
+def add_amounts(deltas):
+    """{(kun, bino_id, tur): summa} ni jadvalga qo'shadi (manfiy - ayiradi)."""
+    for (day, building_id, kind), amount in deltas.items():
+        if not amount:
+            continue
+        rows = DailyRevenue.objects.filter(day=day, building_id=building_id, kind=kind)
+        if rows.update(amount=F('amount') + amount):
+            continue
+        try:
+            with transaction.atomic():
+                DailyRevenue.objects.create(day=day, building_id=building_id, kind=kind, amount=amount)
+        except IntegrityError:
+            # Parallel tranzaksiya shu qatorni hozirgina yaratdi
+            rows.update(amount=F('amount') + amount)
+
+
+def apply_payments(payments, building_id):
+    """
+    Bitta shartnoma (binosi building_id) to'lovlarining o'zgarishini
+    jadvalga yozadi: bazadan o'qilgan holat ayiriladi, hozirgisi qo'shiladi.
+    """
+    deltas = defaultdict(int)
+    for payment in payments:
+        loaded = getattr(payment, '_loaded_rollup', None)
+        current = snapshot(payment)
+        if loaded == current:
+            continue
+        for state, sign in ((loaded, -1), (current, 1)):
+            found = _contribution(state, building_id) if state else None
+            if found:
+                key, amount = found
+                deltas[key] += sign * amount
+        payment._loaded_rollup = current
+    add_amounts(deltas)
+
+
+def remove_payments(payments, building_id):
+    """O'chirilgan to'lovlar hissasini ayiradi."""
+    deltas = defaultdict(int)
+    for payment in payments:
+        found = _contribution(getattr(payment, '_loaded_rollup', None) or snapshot(payment), building_id)
+        if found:
+            key, amount = found
+            deltas[key] -= amount
+    add_amounts(deltas)
+
+
+def move_contract(contract, old_building_id, new_building_id):
+    """Shartnoma boshqa uyga (binoga) o'tganda uning tushumini ko'chiradi."""
+    if old_building_id == new_building_id:
+        return
+    payments = list(Rasrochka.objects.filter(client=contract, amount_paid__gt=0))
+    remove_payments(payments, old_building_id)
+    for payment in payments:
+        payment._loaded_rollup = None
+    apply_payments(payments, new_building_id)
+
+
+def ledger_totals():
+    """Rasrochka jadvalidan {(kun, bino_id, tur): summa} - bitta guruhlangan so'rov."""
+    rows = (
+        Rasrochka.objects
+        .filter(amount_paid__gt=0, pay_date__isnull=False)
+        .annotate(
+            day=TruncDate('pay_date'),
+            kind=Case(When(month=0, then=Value(KIND_ADVANCE)), default=Value(KIND_MONTHLY)),
+        )
+        .order_by()
+        .values('day', 'client__home__building', 'kind')
+        .annotate(amount=Sum('amount_paid'))
+    )
+    return {(row['day'], row['client__home__building'], row['kind']): row['amount'] for row in rows}
+
+
+def rebuild_rollups():
+    """Jadvalni Rasrochka dan noldan tiklaydi. Yozilgan qatorlar soni qaytadi."""
+    totals = ledger_totals()
+    DailyRevenue.objects.all().delete()
+    DailyRevenue.objects.bulk_create([
+        DailyRevenue(day=day, building_id=building_id, kind=kind, amount=amount)
+        for (day, building_id, kind), amount in totals.items()
+    ], batch_size=1000)
+    return len(totals)
+
+
+def revenue_between(start=None, end=None, group_by=None, building=None):
+    """
+    [start, end] kunlari tushumi. group_by berilmasa umumiy summa, aks holda
+    {guruh: summa} ('day', 'building' yoki 'kind' bo'yicha).
+    """
+    rows = DailyRevenue.objects.order_by()
+    if start is not None:
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        rows = rows.filter(day__lte=end)
+    if building is not None:
+        rows = rows.filter(building=building)
+    if group_by is None:
+        return rows.aggregate(total=Sum('amount'))['total'] or 0
+    return {
+        row[group_by]: row['total']
+        for row in rows.values(group_by).annotate(total=Sum('amount')).order_by(group_by)
+    }
+
+
+def revenue_periods(periods):
+    """{nom: (start, end)} davrlar summasi bitta so'rovda (end/start None bo'lishi mumkin)."""
+    aggregates = {}
+    for name, (start, end) in periods.items():
+        condition = Q()
+        if start is not None:
+            condition &= Q(day__gte=start)
+        if end is not None:
+            condition &= Q(day__lte=end)
+        aggregates[name] = Sum('amount', filter=condition) if condition else Sum('amount')
+    totals = DailyRevenue.objects.aggregate(**aggregates)
+    return {name: value or 0 for name, value in totals.items()}
@@ -0,0 +1,144 @@
+"""
+To'lov jadvali (rasrochka) hisob-kitobi.
+
+Modul ORM ga bog'liq emas: narx, oldindan to'lov, muddat, to'lov kuni va
+boshlanish sanasidan oylar bo'yicha sanalar va summalarni hisoblaydi.
+Sanalar (ordinal) va summalar ``array`` da saqlanadi, shuning uchun minglab
+jadvalni bir vaqtda hisoblash (import, "nima bo'ladi" hisobotlari) arzon.
+"""
+import calendar
+from array import array
+from datetime import date, datetime
+
+ROUNDING_STEP = 100000
+
+
+def clamp_day(year, month, day):
+    """Oyda bunday kun bo'lmasa (31-fevral), oyning oxirgi kuni qaytadi."""
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def shift_month(value, months, day):
+    """value dan months oy keyingi sana, kun day ga (oy oxirigacha) tenglanadi."""
+    index = value.year * 12 + (value.month - 1) + months
+    return clamp_day(index // 12, index % 12 + 1, day)
+
+
+def monthly_installment(residual, term, step=ROUNDING_STEP):
+    """Oylik to'lov: qoldiq / muddat, step (100 000 so'm) gacha pastga yaxlitlangan."""
+    if term <= 0:
+        return 0
+    return int(residual) // term // step * step
+
+
+def first_payment_date(start, pay_day):
+    """
+    Jadval hisoblanadigan tayanch sana: shartnoma oyidagi to'lov kuni,
+    agar u shartnoma kunidan oldin bo'lsa - keyingi oy.
+    """
+    if isinstance(start, datetime):
+        start = start.date()
+    base = clamp_day(start.year, start.month, pay_day)
+    if base.day < start.day:
+        base = shift_month(base, 1, pay_day)
+    return base
+
+
+def payment_dates(start, pay_day, term):
+    """1..term oylar uchun to'lov sanalari (date.toordinal() ko'rinishida)."""
+    base = first_payment_date(start, pay_day)
+    return array('l', (shift_month(base, month, pay_day).toordinal() for month in range(1, term + 1)))
+
+
+def split_amounts(residual, term, monthly=None):
+    """
+    Qoldiqni term oyga taqsimlaydi: har oy min(monthly, qolgan), oxirgi oy
+    esa qolgan hamma summani oladi. Yig'indi doimo residual ga teng.
+    """
+    residual = int(residual)
+    if term <= 0:
+        return array('q')
+    if monthly is None:
+        monthly = residual // term
+    monthly = int(monthly)
+
+    if monthly <= 0:
+        # Oylik to'lov 0 gacha yaxlitlangan: hamma summa oxirgi oyda (min(0, qolgan) = 0)
+        amounts = array('q', [0]) * (term - 1)
+        amounts.append(residual)
+        return amounts
+
+    full = min(term - 1, residual // monthly)
+    amounts = array('q', [monthly]) * full
+    remaining = residual - monthly * full
+    if full < term - 1:
+        # monthly qolgan summadan katta: bitta qisman oy, keyin nollar
+        amounts.append(remaining)
+        amounts.extend(array('q', [0]) * (term - 2 - full))
+        remaining = 0
+    amounts.append(remaining)
+    return amounts
+
+
+class Schedule:
+    __slots__ = ('price', 'advance', 'residual', 'monthly', 'pay_day', 'dates', 'amounts')
+
+    def __init__(self, price, advance, residual, monthly, pay_day, dates, amounts):
+        self.price = price
+        self.advance = advance
+        self.residual = residual
+        self.monthly = monthly
+        self.pay_day = pay_day
+        self.dates = dates
+        self.amounts = amounts
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __iter__(self):
+        """(oy raqami, sana, summa) juftliklari."""
+        for idx, (ordinal, amount) in enumerate(zip(self.dates, self.amounts), start=1):
+            yield idx, date.fromordinal(ordinal), amount
+
+    @property
+    def total(self):
+        return sum(self.amounts)
+
+
+def build_schedule(price, advance, term, pay_day, start, step=ROUNDING_STEP):
+    return build_schedules([(price, advance, term, pay_day, start)], step)[0]
+
+
+def build_schedules(items, step=ROUNDING_STEP):
+    """
+    Ko'p jadvalni bir vaqtda hisoblaydi. items - (price, advance, term,
+    pay_day, start) lar ketma-ketligi. Bir xil sana parametrlari va bir xil
+    summa taqsimotlari qayta hisoblanmaydi - bunday jadvallar bitta array ni
+    bo'lishadi, shuning uchun natijani o'zgartirmang.
+    """
+    date_cache = {}
+    amount_cache = {}
+    schedules = []
+    for price, advance, term, pay_day, start in items:
+        price = int(price)
+        advance = int(advance)
+        residual = max(price - advance, 0)
+        if residual == 0:
+            term = 0
+        elif term <= 0:
+            raise ValueError("To'lov muddati 0 bo'lsa, to'liq to'lov qilinishi kerak.")
+        monthly = monthly_installment(residual, term, step)
+
+        start_day = start.date() if isinstance(start, datetime) else start
+        date_key = (start_day, pay_day, term)
+        if date_key not in date_cache:
+            date_cache[date_key] = payment_dates(start_day, pay_day, term)
+        amount_key = (residual, term)
+        if amount_key not in amount_cache:
+            amount_cache[amount_key] = split_amounts(residual, term, monthly)
+
+        schedules.append(Schedule(
+            price, advance, residual, monthly, pay_day,
+            date_cache[date_key], amount_cache[amount_key],
+        ))
+    return schedules
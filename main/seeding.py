@@ -0,0 +1,169 @@
+"""
+Sinov ma'lumotlari (so'rov rejalari va benchmarklar uchun).
+
+seed() shaharlar, binolar, uylar, mijozlar va bir necha yillik to'lov
+jadvali bor shartnomalarni bulk_create bilan yaratadi. Shartnomalar
+jadvallari bilan birga SEED_CHUNK_SIZE talik bloklarda yoziladi. O'tgan
+oylar paid_ratio ehtimol bilan to'liq to'langan, qolganlari qarz bo'lib
+qoladi. Oxirida bino hisoblagichlari, kunlik tushum jadvali va keshlar
+qayta hisoblanadi.
+Natija random.Random(seed) bilan takrorlanadi.
+"""
+import random
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from main.dates import day_start
+from main.models import (
+    Building, City, Client, ClientInformation, ContractSequence, Home, HomeInformation, MonthlyRevenue, Rasrochka,
+)
+from main.occupancy import rebuild_occupancy
+from main.rollups import rebuild_rollups
+from main.schedule import build_schedules
+from main.sequences import CONTRACT_SEQUENCE
+from main.stats import invalidate_debt_summary
+
+SEED_CHUNK_SIZE = 500
+
+HEARD_CHOICES = [choice for choice, _ in ClientInformation._meta.get_field('heard').choices]
+TERMS = (12, 24, 36, 48, 60)
+
+
+def _homes(rng, buildings, per_building, busy):
+    """
+    Har bir binoga per_building ta uy; tasodifiy busy tasi band. Band
+    uylarning Home obyektlari aralashtirilgan tartibda qaytadi.
+    """
+    infos = [
+        (building, HomeInformation(
+            padez_number=(number - 1) // 36 + 1,
+            home_number=str(number),
+            home_floor=(number - 1) % 36 // 4 + 1,
+            xona=rng.randint(1, 4),
+            field=rng.randint(35, 120),
+            price=rng.randrange(300, 1500) * 1000000,
+        ))
+        for building in buildings for number in range(1, per_building + 1)
+    ]
+    for _, info in rng.sample(infos, min(busy, len(infos))):
+        info.busy = True
+    HomeInformation.objects.bulk_create([info for _, info in infos], batch_size=1000)
+    homes = [Home(building=building, home=info) for building, info in infos]
+    Home.objects.bulk_create(homes, batch_size=1000)
+    contracted = [home for home in homes if home.home.busy]
+    rng.shuffle(contracted)
+    return homes, contracted
+
+
+def _installments(rng, contract, schedule, start, today, paid_ratio):
+    """Shartnoma jadvali: 0-oy (oldindan to'lov) va oylar, o'tgan oylar qisman to'langan."""
+    rows = [Rasrochka(
+        client=contract, month=0, amount=schedule.advance, amount_paid=schedule.advance, qoldiq=0,
+        pay_date=start, date=start,
+    )]
+    payment_time = start.timetz()
+    for month, payment_date, amount in schedule:
+        date = datetime.combine(payment_date, payment_time)
+        paid = amount if payment_date < today and rng.random() < paid_ratio else 0
+        rows.append(Rasrochka(
+            client=contract, month=month, amount=amount, amount_paid=paid, qoldiq=amount - paid,
+            pay_date=date if paid else None, date=date,
+        ))
+    return rows
+
+
+def _contracts(rng, homes, infos, first_number, years, paid_ratio):
+    """Bir blok shartnoma va ularning jadvallari."""
+    today = timezone.localdate()
+    items = []
+    for home in homes:
+        start = day_start(today - timedelta(days=rng.randrange(years * 365))) + timedelta(hours=rng.randint(9, 18))
+        price = home.home.price
+        advance = price * rng.randint(20, 50) // 100
+        items.append((price, advance, rng.choice([term for term in TERMS if term <= years * 12] or [12]),
+                      rng.randint(1, 28), start))
+
+    contracts, installments = [], []
+    for number, (home, info, (price, advance, term, pay_day, start), schedule) in enumerate(
+        zip(homes, infos, items, build_schedules(items)), start=first_number,
+    ):
+        contract = Client(
+            client=info, contract=number, home=home, passport=f"AA{number:07d}",
+            passport_muddat="2020-01-01", given="IIB", location="Toshkent", term=term, payment=advance,
+            home_price=price, pay_date=pay_day, residual=0, oylik_tolov=schedule.monthly,
+            count_month=term, residu=0, status='Rasmiylashtirilgan', created=start,
+        )
+        rows = _installments(rng, contract, schedule, start, today, paid_ratio)
+        contract.residual = sum(row.qoldiq for row in rows)
+        contract.debt = contract.residual > 0
+        if not contract.debt:
+            contract.status = 'Tugallangan'
+        contracts.append(contract)
+        installments.extend(rows)
+
+    Client.objects.bulk_create(contracts, batch_size=500)
+    for row in installments:
+        row.client_id = row.client.pk
+    Rasrochka.objects.bulk_create(installments, batch_size=1000)
+    return len(installments)
+
+
+def _reserve_numbers(count):
+    """Shartnoma raqamlari hisoblagichidan count ta raqam oladi, birinchisi qaytadi."""
+    sequence = ContractSequence.objects.select_for_update().filter(name=CONTRACT_SEQUENCE).first()
+    start = max(
+        sequence.last_value if sequence else 0,
+        Client.objects.aggregate(Max('contract'))['contract__max'] or 0,
+    )
+    ContractSequence.objects.update_or_create(name=CONTRACT_SEQUENCE, defaults={'last_value': start + count})
+    return start + 1
+
+
+@transaction.atomic
+def seed(cities=2, buildings=3, homes=100, clients=500, years=3, paid_ratio=0.7, seed=0):
+    """
+    cities ta shahar, har birida buildings ta bino, har binoda homes ta uy;
+    clients ta mijoz, ulardan uylar soniga sig'adiganlari shartnoma oladi.
+    Yaratilganlar soni lug'at ko'rinishida qaytadi.
+    """
+    rng = random.Random(seed)
+    city_rows = City.objects.bulk_create([City(name=f"Shahar {idx}") for idx in range(1, cities + 1)])
+    building_rows = Building.objects.bulk_create([
+        Building(
+            city=city, name=f"{city.name} - {idx}-bino", code=f"{idx:03d}"[-3:], podezd=max(homes // 36, 1),
+            apartments=[homes], floor=9, status=True,
+        )
+        for city in city_rows for idx in range(1, buildings + 1)
+    ])
+    home_rows, contracted = _homes(rng, building_rows, homes, clients)
+
+    infos = ClientInformation.objects.bulk_create([
+        ClientInformation(
+            full_name=f"Mijoz {idx}", phone=f"+99890{rng.randrange(10 ** 7):07d}", heard=rng.choice(HEARD_CHOICES),
+        )
+        for idx in range(1, clients + 1)
+    ], batch_size=1000)
+
+    first_number = _reserve_numbers(len(contracted))
+    installments = 0
+    for offset in range(0, len(contracted), SEED_CHUNK_SIZE):
+        installments += _contracts(
+            rng, contracted[offset:offset + SEED_CHUNK_SIZE], infos[offset:offset + SEED_CHUNK_SIZE],
+            first_number + offset, years, paid_ratio,
+        )
+
+    rebuild_occupancy([building.pk for building in building_rows])
+    rebuild_rollups()
+    MonthlyRevenue.objects.all().delete()
+    transaction.on_commit(invalidate_debt_summary)
+    return {
+        'cities': len(city_rows),
+        'buildings': len(building_rows),
+        'homes': len(home_rows),
+        'clients': len(infos),
+        'contracts': len(contracted),
+        'installments': installments,
+    }
@@ -0,0 +1,103 @@
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+
+from main.models import Client, ContractSequence
+
+CONTRACT_SEQUENCE = 'contract'
+
+# Har bir jarayon (gunicorn worker) oldindan olgan raqamlar bloki:
+# {nomi: [keyingi raqam, blokdagi oxirgi raqam]}
+_blocks = {}
+_lock = threading.Lock()
+
+
+def _allocate_block(name, size):
+    """
+    Hisoblagichni bitta F() UPDATE bilan size ga oshiradi va blokning
+    birinchi raqamini qaytaradi. UPDATE qator qulfini oladi, shuning uchun
+    parallel workerlar bir-birini kutadi, lekin bir xil blok olmaydi.
+    """
+    with transaction.atomic():
+        updated = ContractSequence.objects.filter(name=name).update(last_value=F('last_value') + size)
+        if not updated:
+            # Ketma-ketlik hali yo'q - mavjud eng katta raqamdan boshlaymiz
+            start = Client.objects.aggregate(Max('contract'))['contract__max'] or 0
+            ContractSequence.objects.get_or_create(name=name, defaults={'last_value': start})
+            ContractSequence.objects.filter(name=name).update(last_value=F('last_value') + size)
+        last_value = ContractSequence.objects.filter(name=name).values_list('last_value', flat=True).get()
+    return last_value - size + 1
+
+
+def next_contract_number(name=CONTRACT_SEQUENCE):
+    """
+    Keyingi shartnoma raqami.
+
+    CONTRACT_NUMBER_BLOCK_SIZE > 1 bo'lsa, worker bazadan bir yo'la blok oladi
+    va keyingi raqamlarni xotiradan beradi (raqamlar o'sib boradi, lekin
+    workerlar orasida oraliqlar paydo bo'lishi mumkin). Blok faqat tranzaksiya
+    muvaffaqiyatli tugagach eslab qolinadi: rollback bo'lsa hisoblagich ham
+    orqaga qaytadi va blok boshqa workerga qayta berilishi mumkin.
+    """
+    size = max(int(getattr(settings, 'CONTRACT_NUMBER_BLOCK_SIZE', 1)), 1)
+    with _lock:
+        block = _blocks.get(name)
+        if block and block[0] <= block[1]:
+            number = block[0]
+            block[0] += 1
+            return number
+        _blocks.pop(name, None)
+
+    number = _allocate_block(name, size)
+    if size > 1:
+        def remember():
+            with _lock:
+                _blocks[name] = [number + 1, number + size - 1]
+        transaction.on_commit(remember)
+    return number
+
+
+def create_numbered(create, name=CONTRACT_SEQUENCE, attempts=2):
+    """
+    create(raqam) ni keyingi shartnoma raqami bilan savepoint ichida chaqiradi.
+    claim_number faqat o'z jarayonining blokini tashlaydi: boshqa workerning
+    blokidagi raqam qo'lda berilgan bo'lishi mumkin. Raqam band bo'lsa (unique
+    xatosi) blok tashlanadi va bazadan yangi raqam olinadi - u last_value dan,
+    ya'ni claim_number orqali berilgan har qanday raqamdan katta.
+    """
+    for attempt in range(attempts):
+        number = next_contract_number(name)
+        try:
+            with transaction.atomic():
+                return create(number)
+        except IntegrityError:
+            if attempt == attempts - 1 or not Client.objects.filter(contract=number).exists():
+                raise
+            with _lock:
+                _blocks.pop(name, None)
+
+
+def claim_number(number, name=CONTRACT_SEQUENCE):
+    """
+    Qo'lda berilgan raqam (shartnoma raqamini o'zgartirish). Hisoblagich
+    undan orqada bo'lsa, number gacha suriladi - aks holda keyingi yangi
+    shartnoma shu raqamni olib, unique xatosiga uchraydi. Tranzaksiya
+    tugagach shu workerning xotiradagi bloki ham tashlab yuboriladi
+    (boshqa workerlar bloki - create_numbered).
+    """
+    with transaction.atomic():
+        sequence = ContractSequence.objects.select_for_update().filter(name=name).first()
+        if sequence is None:
+            start = Client.objects.aggregate(Max('contract'))['contract__max'] or 0
+            ContractSequence.objects.get_or_create(name=name, defaults={'last_value': max(start, number)})
+        elif sequence.last_value < number:
+            ContractSequence.objects.filter(pk=sequence.pk).update(last_value=number)
+    transaction.on_commit(reset_blocks)
+
+
+def reset_blocks():
+    """Xotiradagi bloklarni tashlab yuboradi (testlar va ketma-ketlikni qo'lda o'zgartirganda)."""
+    with _lock:
+        _blocks.clear()
@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from main.blobs import release, retain
+from main.models import Client, Home, HomeInformation, Rasrochka
+from main.occupancy import adjust_occupancy
+from main.revenue import invalidate_months
+from main.rollups import apply_payments, contract_building, remove_payments, snapshot
+from main.stats import invalidate_debt_summary
+from main.thumbnails import warm_after_commit
+
+
+@receiver(pre_delete, sender=Home)
+def release_home_occupancy(sender, instance, **kwargs):
+    # Kaskad o'chirishda ham (Building, HomeInformation) hisoblagich to'g'ri qoladi
+    busy = Home.objects.filter(pk=instance.pk, home__busy=True).exists()
+    adjust_occupancy([instance.building_id], total=-1, busy=-1 if busy else 0)
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def reset_debt_summary(sender, **kwargs):
+    # Tranzaksiya tugagach tozalaymiz, aks holda parallel so'rov eski qiymatni keshlab qo'yadi
+    transaction.on_commit(invalidate_debt_summary)
+
+
+@receiver(post_save, sender=Rasrochka)
+@receiver(post_delete, sender=Rasrochka)
+def reset_monthly_revenue(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_months([instance.date, getattr(instance, '_loaded_date', None)])
+    instance._loaded_date = instance.date
+
+
+@receiver(post_save, sender=Rasrochka)
+def update_daily_revenue(sender, instance, raw=False, **kwargs):
+    if raw or getattr(instance, '_loaded_rollup', None) == snapshot(instance):
+        return
+    apply_payments([instance], contract_building(instance.client_id))
+
+
+@receiver(post_delete, sender=Rasrochka)
+def remove_daily_revenue(sender, instance, **kwargs):
+    if instance.amount_paid:
+        remove_payments([instance], contract_building(instance.client_id))
+
+
+@receiver(post_save, sender=HomeInformation)
+def track_home_files(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_files', {})
+    current = {}
+    added, removed = [], []
+    for name in HomeInformation.FILE_FIELDS:
+        if update_fields is not None and name not in update_fields:
+            if name in loaded:
+                current[name] = loaded[name]
+            continue
+        current[name] = getattr(instance, name).name or ''
+        if created:
+            added.append(current[name])
+        elif name in loaded and loaded[name] != current[name]:
+            added.append(current[name])
+            removed.append(loaded[name])
+    retain(added)
+    release(removed)
+    # Kichraytirilgan nusxalar so'rov paytida emas, fon vazifasida yaratiladi
+    warm_after_commit(added)
+    instance._loaded_files = current
+
+
+@receiver(post_delete, sender=HomeInformation)
+def release_home_files(sender, instance, **kwargs):
+    release(getattr(instance, name).name for name in HomeInformation.FILE_FIELDS)
+
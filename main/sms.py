@@ -0,0 +1,107 @@
+"""
+SMS yuborish (Eskiz API).
+
+SmsSender ko'p SMS ni bitta event loop va bitta aiohttp.ClientSession
+(ulanishlar va TLS sessiyasi qayta ishlatiladi) orqali yuboradi. Bir
+vaqtdagi so'rovlar soni SMS_CONCURRENCY bilan, sekundiga yuboriladigan SMS
+soni provayder limiti SMS_RATE_LIMIT bilan cheklanadi. Tarmoq xatosi,
+429 va 5xx javoblarda SMS_RETRIES martagacha qayta uriniladi, har safar
+kutish vaqti ikki baravar oshadi.
+
+Natija - har bir qabul qiluvchi uchun lug'at:
+{'phone', 'ok', 'status', 'response', 'attempts'}.
+"""
+import asyncio
+import logging
+
+import aiohttp
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket: sekundiga rate ta ruxsat, burst tagacha yig'ilishi mumkin."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self.updated is not None:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SmsSender:
+    def __init__(self, url=None, token=None, sender=None, concurrency=None, rate=None,
+                 retries=None, backoff=0.5, timeout=None):
+        self.url = url or settings.SMS_API_URL
+        self.token = settings.SMS_API_TOKEN if token is None else token
+        self.sender = settings.SMS_SENDER if sender is None else sender
+        self.concurrency = concurrency or settings.SMS_CONCURRENCY
+        self.rate = rate or settings.SMS_RATE_LIMIT
+        self.retries = settings.SMS_RETRIES if retries is None else retries
+        self.backoff = backoff
+        self.timeout = timeout or settings.SMS_TIMEOUT
+
+    async def _post(self, session, phone, text):
+        data = {"mobile_phone": phone, "message": text, "from": self.sender}
+        async with session.post(self.url, data=data) as response:
+            return response.status, await response.text()
+
+    async def _send(self, session, limiter, semaphore, phone, text):
+        result = {'phone': phone, 'ok': False, 'status': None, 'response': '', 'attempts': 0}
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                await limiter.acquire()
+                result['attempts'] = attempt + 1
+                try:
+                    result['status'], result['response'] = await self._post(session, phone, text)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result['status'], result['response'] = None, str(e) or e.__class__.__name__
+                    continue
+                if result['status'] not in RETRY_STATUSES:
+                    break
+        result['ok'] = result['status'] == 200
+        if not result['ok']:
+            logger.info(f"SMS send error:\nphone: {phone}\nstatus: {result['status']}\nresponse: {result['response']}")
+        return result
+
+    async def send_many(self, messages):
+        """messages - (telefon, matn) juftliklari; natijalar shu tartibda qaytadi."""
+        limiter = RateLimiter(self.rate)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        headers = {"Authorization": f"Bearer {self.token}"}
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+            return await asyncio.gather(*(
+                self._send(session, limiter, semaphore, phone, text) for phone, text in messages
+            ))
+
+    def send(self, messages):
+        """Sinxron koddan (view, buyruq) chaqirish uchun: bitta event loop."""
+        return asyncio.run(self.send_many(list(messages)))
+
+
+def send_sms(phone, text):
+    """Bitta SMS; yuborilgan bo'lsa True."""
+    if not phone:
+        return False
+    return SmsSender().send([(phone, text)])[0]['ok']
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from main.models import Client
+
+DEBT_SUMMARY_KEY = 'main:debt_summary'
+
+
+def debt_summary():
+    """
+    Qarzdor shartnomalar soni va umumiy qarz. Natija keshda saqlanadi va
+    shartnoma (Client) o'zgarganda tozalanadi (main.signals).
+    """
+    summary = cache.get(DEBT_SUMMARY_KEY)
+    if summary is None:
+        totals = Client.objects.aggregate(
+            debtors_count=Count('id', filter=Q(debt=True)),
+            total_debt=Sum('residual', filter=Q(debt=True)),
+        )
+        summary = {
+            'debtors_count': totals['debtors_count'],
+            'total_debt': float(totals['total_debt'] or 0),
+        }
+        cache.set(DEBT_SUMMARY_KEY, summary, getattr(settings, 'DEBT_SUMMARY_TIMEOUT', 300))
+    return summary
+
+
+def invalidate_debt_summary():
+    cache.delete(DEBT_SUMMARY_KEY)
@@ -0,0 +1,72 @@
+"""
+Tarkib bo'yicha (SHA-256) manzillanadigan fayl ombori.
+
+Fayl nomi uning tarkibidan hosil qilinadi: floor_plans/ab/ab12...ef.png.
+Bir xil rasm necha marta yuklanmasin, diskda bitta nusxa bo'ladi. Faylni
+qachon o'chirish mumkinligini main.blobs dagi havolalar hisoblagichi hal qiladi.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+
+        extension = os.path.splitext(name)[1].lower()
+        name = posixpath.join(posixpath.dirname(name), digest[:2], f"{digest}{extension}")
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Nom tarkibdan hosil qilingan - mavjud fayl aynan shu rasm
+        return name
+
+    def save_exact(self, name, content):
+        """Nomni o'zgartirmasdan saqlaydi (rasmdan hosil qilingan fayllar uchun - main.thumbnails)."""
+        name = self.generate_filename(name)
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            return name
+
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # Parallel yuklashda yarim yozilgan fayl ko'rinmasligi uchun avval vaqtinchalik faylga
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+default_content_storage = ContentAddressedStorage()
+
+
+def content_storage():
+    return default_content_storage
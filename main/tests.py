@@ -1,3 +1,1177 @@
-from django.test import TestCase
+import calendar
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
 
-# Create your tests here.
+import openpyxl
+from openpyxl.drawing.image import Image as SheetImage
+from PIL import Image
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.models import City, Building, HomeInformation, Home, Client, ClientInformation, ContractSequence, DailyRevenue, Expense, ExpenseType, Job, MonthlyRevenue, PaymentReminder, Rasrochka, SmsCampaign, SmsMessage, StoredBlob
+from main import jobs, outbox, reminders, revenue, rollups, schedule, sequences, thumbnails
+from main.dates import day_start
+from main.occupancy import rebuild_occupancy
+from main.sequences import next_contract_number, reset_blocks
+from main.sms import SmsSender
+from api.fetcher import ImageFetcher
+from api.importers import import_homes
+
+
+def create_building(city, name, homes=3, busy=0):
+    building = Building.objects.create(city=city, name=name, podezd=1, apartments=[homes], floor=9)
+    for number in range(1, homes + 1):
+        info = HomeInformation.objects.create(
+            padez_number=1, home_number=str(number), home_floor=1,
+            xona=2, field=50, price=1000000, busy=number <= busy,
+        )
+        Home.objects.create(building=building, home=info)
+    return building
+
+
+class DashboardAPITest(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('admin', password='admin'))
+        self.city = City.objects.create(name="Toshkent")
+
+    def test_response_shape(self):
+        create_building(self.city, "A", homes=4, busy=1)
+        response = self.api.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['building_count'], 1)
+        self.assertEqual(response.data['building_names'], ["A"])
+        self.assertEqual(response.data['building_cities'], ["Toshkent"])
+        self.assertEqual(response.data['home_occupancy_percentage'], [25])
+        self.assertFalse(response.data['tushum']['status'])
+        self.assertEqual(len(response.data['week_client_counts']), 7)
+        self.assertEqual(set(response.data['client_heard_counts']), {
+            'Instagramda', 'Telegramda', 'YouTubeda', 'Odamlar orasida', 'Xech qayerda'
+        })
+
+    def test_query_budget_does_not_grow_with_buildings(self):
+        create_building(self.city, "A")
+        with self.assertNumQueries(8):
+            self.api.get('/dashboard/')
+
+        for idx in range(10):
+            create_building(self.city, f"B{idx}", homes=2, busy=1)
+        with self.assertNumQueries(8):
+            response = self.api.get('/dashboard/')
+        self.assertEqual(response.data['building_count'], 11)
+
+    def test_month_client_counts_current_month_of_any_year(self):
+        now = timezone.localtime()
+        for created in (now, now.replace(year=now.year - 4), now - timedelta(days=40)):
+            ClientInformation.objects.filter(
+                pk=ClientInformation.objects.create(full_name="Mijoz", phone="+998901234567").pk
+            ).update(created=created)
+        self.assertEqual(self.api.get('/dashboard/').data['month_client'], 2)
+
+    def test_expense_summary_uses_local_days(self):
+        expense_type = ExpenseType.objects.create(name="Qurilish")
+        today = timezone.localdate()
+        for created, amount in ((day_start(today) + timedelta(minutes=30), 100),
+                                (day_start(today) - timedelta(minutes=30), 20),
+                                (day_start(today.replace(day=1)) - timedelta(minutes=30), 3)):
+            expense = Expense.objects.create(expense_type=expense_type, amount=amount)
+            Expense.objects.filter(pk=expense.pk).update(created=created)
+
+        response = self.api.get('/expenses/summary/')
+        self.assertEqual(response.data['daily_total'], 100)
+        self.assertEqual(response.data['monthly_total'], 100 if today.day == 1 else 120)
+        self.assertEqual(response.data['total_expenses'], 123)
+
+    def test_query_plans_use_new_indexes(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('query_plans', seed=60, compare=True, output=output.name, stdout=io.StringIO())
+            plans = json.load(output)
+        self.assertIn('rasrochka_client_unpaid_idx', plans['after']['contract_unpaid'])
+        self.assertNotIn('rasrochka_client_unpaid_idx', plans['before']['contract_unpaid'])
+        self.assertIn('client_status_created_idx', plans['after']['contracts_by_status'])
+        # Sinov ma'lumotlari va o'chirilgan indekslar bekor qilinadi
+        self.assertFalse(Client.objects.exists())
+        with connection.cursor() as cursor:
+            self.assertIn('rasrochka_client_unpaid_idx', connection.introspection.get_constraints(cursor, 'main_rasrochka'))
+
+
+class BuildingOccupancyTest(TestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="Toshkent")
+
+    def assertOccupancy(self, building, total, busy):
+        building.refresh_from_db()
+        self.assertEqual(
+            (building.homes_total, building.homes_busy, building.homes_free),
+            (total, busy, total - busy),
+        )
+
+    def test_counters_follow_home_writes(self):
+        building = create_building(self.city, "A", homes=3, busy=1)
+        self.assertOccupancy(building, 3, 1)
+
+        info = HomeInformation.objects.get(home_number="3")
+        info.busy = True
+        info.save()
+        self.assertOccupancy(building, 3, 2)
+
+        info = HomeInformation.objects.get(home_number="1")
+        info.busy = False
+        info.save()
+        self.assertOccupancy(building, 3, 1)
+
+        Home.objects.get(home__home_number="3").delete()
+        self.assertOccupancy(building, 2, 0)
+
+    def test_rebuild_from_scratch(self):
+        building = create_building(self.city, "A", homes=4, busy=2)
+        Building.objects.filter(pk=building.pk).update(homes_total=0, homes_busy=0, homes_free=0)
+        self.assertEqual(rebuild_occupancy(), 1)
+        self.assertOccupancy(building, 4, 2)
+
+
+class ContractCreateTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('admin', password='admin'))
+        self.building = create_building(City.objects.create(name="Toshkent"), "A", homes=3)
+
+    def create_contract(self, home_number, term, payment):
+        return self.api.post('/clients/', {
+            'building': self.building.pk, 'padez_number': 1, 'home_number': home_number,
+            'full_name': f"Mijoz {home_number}", 'phone': '901234567', 'passport': 'AA1234567',
+            'term': term, 'payment': payment, 'status': 'Rasmiylashtirilgan',
+            'pay_date': 10, 'price': 1000000, 'created': '2025-01-20',
+        }, format='json')
+
+    def test_schedule_reconciles_to_residual(self):
+        response = self.create_contract("1", term=12, payment=5000000)
+        self.assertEqual(response.status_code, 201)
+        contract = Client.objects.get(pk=response.data['id'])
+        self.assertEqual(contract.residual, 45000000)
+        months = Rasrochka.objects.filter(client=contract, month__gt=0)
+        self.assertEqual(months.count(), 12)
+        self.assertEqual(sum(p.amount for p in months), 45000000)
+        self.assertTrue(all(p.qoldiq == p.amount for p in months))
+        self.assertEqual(Rasrochka.objects.get(client=contract, month=0).qoldiq, 0)
+
+    def test_full_payment_closes_contract(self):
+        response = self.create_contract("1", term="0", payment=50000000)
+        self.assertEqual(response.status_code, 201)
+        contract = Client.objects.get(pk=response.data['id'])
+        self.assertEqual((contract.status, contract.debt, contract.residual), ("Tugallangan", False, 0))
+        self.assertEqual(Rasrochka.objects.filter(client=contract).count(), 1)
+
+    def test_update_months_count_keeps_sum(self):
+        contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        for months in (18, 6):
+            response = self.api.post(f'/clients/{contract_id}/update-months-count/', {'months_count': months}, format='json')
+            self.assertEqual(response.status_code, 200)
+            rows = Rasrochka.objects.filter(client_id=contract_id, month__gt=0)
+            self.assertEqual(rows.count(), months)
+            self.assertEqual(sum(p.qoldiq for p in rows), 45000000)
+
+    def test_list_is_compact_and_query_bounded(self):
+        self.create_contract("1", term=12, payment=5000000)
+        with CaptureQueriesContext(connection) as one_contract:
+            self.api.get('/clients/')
+        self.create_contract("2", term=24, payment=5000000)
+        self.create_contract("3", term=36, payment=5000000)
+        with CaptureQueriesContext(connection) as three_contracts:
+            response = self.api.get('/clients/')
+        self.assertEqual(len(one_contract), len(three_contracts))
+        self.assertLessEqual(len(three_contracts), 2)
+
+        row = next(r for r in response.data['results'] if r['home_number'] == "3")
+        self.assertNotIn('payments', row)
+        self.assertEqual(row['building_name'], "A")
+        self.assertEqual(row['total_remaining'], 45000000)
+        self.assertEqual(row['remaining_months'], 36)
+
+        response = self.api.get('/clients/?expand=payments')
+        self.assertEqual(sorted(len(r['payments']) for r in response.data['results']), [13, 25, 37])
+
+    def test_sparse_fieldsets_prune_joins(self):
+        self.create_contract("1", term=12, payment=5000000)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get('/clients/?fields=id,contract,status')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'contract', 'status'})
+        page_sql = queries[-1]['sql']
+        self.assertNotIn('main_clientinformation', page_sql)
+        self.assertNotIn('main_rasrochka', page_sql)
+
+        response = self.api.get('/clients/?omit=total_paid,client_phone&expand=client_info')
+        row = response.data['results'][0]
+        self.assertNotIn('total_paid', row)
+        self.assertNotIn('client_phone', row)
+        self.assertEqual(row['client_info']['full_name'], "Mijoz 1")
+
+        response = self.api.get('/homes/?fields=id,building_name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'building_name'})
+
+    def test_retrieve_payment_info(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            short_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        long_id = self.create_contract("2", term=120, payment=5000000).data['id']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(f'/clients/{short_id}/')
+        self.assertLessEqual(len(queries), 3)
+        info = response.data['payment_info']
+        self.assertEqual(info['initial_payment'], 5000000)
+        self.assertEqual(info['total_remaining'], 45000000)
+        self.assertEqual(info['monthly_payment'], 3700000)
+        self.assertEqual(info['next_unpaid_month'], 1)
+        self.assertEqual(info['remaining_months'], 12)
+        self.assertTrue(info['is_in_debt'])
+
+        # Kesh: global qarz statistikasi qayta hisoblanmaydi
+        with self.assertNumQueries(2):
+            self.api.get(f'/clients/{long_id}/')
+
+    def test_debt_summary_invalidated_on_payment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        info = self.api.get(f'/clients/{contract_id}/').data['payment_info']
+        self.assertEqual((info['debtors_count'], info['total_debt']), (1, 45000000))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.post(f'/clients/{contract_id}/process-payment/', {
+                'payment_type': 'custom', 'custom_amount': 45000000,
+            }, format='json')
+        info = self.api.get(f'/clients/{contract_id}/').data['payment_info']
+        self.assertEqual((info['debtors_count'], info['total_debt']), (0, 0))
+
+    def test_custom_payment_allocation(self):
+        contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        url = f'/clients/{contract_id}/process-payment/'
+
+        response = self.api.post(url, {'payment_type': 'custom', 'custom_amount': 8000000}, format='json')
+        self.assertEqual(response.status_code, 200)
+        allocations = response.data['allocations']
+        self.assertEqual([a['month'] for a in allocations], [1, 2, 3])
+        self.assertEqual([a['paid'] for a in allocations], [3700000, 3700000, 600000])
+        self.assertEqual(allocations[-1]['qoldiq'], 3100000)
+        self.assertEqual(response.data['unallocated'], 0)
+        self.assertEqual(Client.objects.get(pk=contract_id).residual, 37000000)
+
+        # Ortiqcha summa qoldiqni manfiy qilmaydi
+        with CaptureQueriesContext(connection) as large_payment:
+            response = self.api.post(url, {'payment_type': 'custom', 'custom_amount': 40000000}, format='json')
+        self.assertEqual(len(response.data['allocations']), 10)
+        self.assertEqual(response.data['unallocated'], 3000000)
+        contract = Client.objects.get(pk=contract_id)
+        self.assertEqual((contract.residual, contract.debt, contract.status), (0, False, "Tugallangan"))
+        self.assertFalse(Rasrochka.objects.filter(client=contract, qoldiq__gt=0).exists())
+        self.assertLess(len(large_payment), 15)
+
+    def test_contract_numbers_are_sequential_and_unique(self):
+        reset_blocks()
+        first = self.create_contract("1", term=12, payment=5000000).data
+        second = self.create_contract("2", term=12, payment=5000000).data
+        self.assertEqual((first['contract'], second['contract']), (1, 2))
+
+        response = self.api.patch(f"/clients/{second['id']}/", {'contract': 1}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Client.objects.get(pk=second['id']).contract, 2)
+
+        # Hisoblagichdan oldinga o'tgan qo'lda berilgan raqam keyingi shartnomaga berilmaydi
+        response = self.api.patch(f"/clients/{second['id']}/", {'contract': 5}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ContractSequence.objects.get(name='contract').last_value, 5)
+        self.assertEqual(self.create_contract("3", term=12, payment=5000000).data['contract'], 6)
+        response = self.api.patch(f"/clients/{second['id']}/", {'contract': 'abc'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        # Tekshiruvdan keyin raqamni parallel so'rov olib qo'ysa ham 500 emas, 400
+        with mock.patch.object(Client, 'save', side_effect=IntegrityError):
+            response = self.api.patch(f"/clients/{second['id']}/", {'contract': 9}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Client.objects.get(pk=second['id']).contract, 5)
+
+    @override_settings(CONTRACT_NUMBER_BLOCK_SIZE=10)
+    def test_contract_number_block_allocation(self):
+        reset_blocks()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(next_contract_number(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual([next_contract_number() for _ in range(9)], list(range(2, 11)))
+        self.assertEqual(ContractSequence.objects.get(name='contract').last_value, 10)
+        # Blok tugadi - keyingi blok bazadan olinadi
+        self.assertEqual(next_contract_number(), 11)
+        self.assertEqual(ContractSequence.objects.get(name='contract').last_value, 20)
+        reset_blocks()
+
+    @override_settings(CONTRACT_NUMBER_BLOCK_SIZE=10)
+    def test_number_claimed_from_another_workers_block_is_skipped(self):
+        reset_blocks()
+        self.addCleanup(reset_blocks)
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.create_contract("1", term=12, payment=5000000).data
+        self.assertEqual(first['contract'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.patch(f"/clients/{first['id']}/", {'contract': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        # Boshqa worker xotirasida 2..10 bloki qolgan (claim_number uni tashlay olmaydi)
+        sequences._blocks['contract'] = [2, 10]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.create_contract("2", term=12, payment=5000000)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['contract'], 11)
+        self.assertEqual(ContractSequence.objects.get(name='contract').last_value, 20)
+
+    def test_update_reports_other_integrity_errors(self):
+        contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        # Raqam o'zgarmagan: boshqa unique xatosi "raqam band" deb ko'rsatilmaydi
+        with mock.patch.object(ClientInformation, 'save', side_effect=IntegrityError), \
+                self.assertRaises(IntegrityError):
+            self.api.patch(f'/clients/{contract_id}/', {'full_name': "Yangi"}, format='json')
+
+    def test_contract_pdfs_are_prerendered_in_background(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        jobs.discover()
+
+        with override_settings(PDF_CACHE_DIR=cache_dir), \
+                mock.patch('api.pdf.render_to_string', return_value='<html></html>'), \
+                mock.patch('api.pdf.write_pdf', return_value=b'%PDF-1.7') as write_pdf:
+            with self.captureOnCommitCallbacks(execute=True):
+                contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+            self.assertEqual(Job.objects.filter(kind='contract_pdf', status='pending').count(), 1)
+            jobs.run_pending()
+            self.assertEqual(write_pdf.call_count, 2)
+
+            response = self.api.get(f'/contract-pdf/{contract_id}/')
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
+            response.close()
+            self.api.get(f'/jadval-download/{contract_id}/').close()
+            self.assertEqual(write_pdf.call_count, 2)
+
+            # To'lovdan keyin eski PDF berilmaydi - yangisi navbatga qo'yiladi
+            with self.captureOnCommitCallbacks(execute=True):
+                self.api.post(f'/clients/{contract_id}/process-payment/', {'payment_type': 'custom', 'custom_amount': 1000000}, format='json')
+            response = self.api.get(f'/contract-pdf/{contract_id}/')
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(Job.objects.get(pk=response.data['job']).status, 'pending')
+            self.assertEqual(Job.objects.filter(kind='contract_pdf', status='pending').count(), 1)
+            jobs.run_pending()
+            self.assertEqual(write_pdf.call_count, 4)
+            self.assertEqual(self.api.get(f'/contract-pdf/{contract_id}/').status_code, 200)
+
+        self.assertEqual(sorted(name.split('-')[0] for name in os.listdir(cache_dir)), ['jadval', 'shartnoma'])
+
+        # Uysiz shartnoma uchun PDF navbatga qo'yilmaydi
+        Client.objects.filter(pk=contract_id).update(home=None)
+        self.assertEqual(self.api.get(f'/contract-pdf/{contract_id}/').status_code, 400)
+        self.assertEqual(self.api.get(f'/jadval-download/{contract_id}/').status_code, 400)
+        self.assertFalse(Job.objects.filter(kind='contract_pdf', status='pending').exists())
+
+    def test_query_count_does_not_depend_on_term(self):
+        # Kunlik tushum qatori birinchi shartnomada yaratiladi
+        self.create_contract("3", term=6, payment=1000000)
+        with CaptureQueriesContext(connection) as short_term:
+            self.create_contract("1", term=12, payment=1000000)
+        with CaptureQueriesContext(connection) as long_term:
+            self.create_contract("2", term=120, payment=1000000)
+        self.assertEqual(len(short_term), len(long_term))
+        self.assertEqual(Rasrochka.objects.filter(client__home__home__home_number="2").count(), 121)
+
+    def test_monthly_revenue_rollup(self):
+        contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        other = create_building(City.objects.get(), "B", homes=1)
+        self.api.post('/clients/', {
+            'building': other.pk, 'padez_number': 1, 'home_number': "1",
+            'full_name': "Mijoz B", 'phone': '901234567', 'passport': 'AA1234567',
+            'term': 6, 'payment': 2000000, 'status': 'Rasmiylashtirilgan',
+            'pay_date': 10, 'price': 1000000, 'created': '2025-01-25',
+        }, format='json')
+
+        rows = dict(revenue.revenue_rows())
+        self.assertEqual(rows[date(2024, 10, 1)], 0)
+        self.assertEqual(rows[date(2025, 1, 1)], 7000000)
+        self.assertEqual(rows[date(2025, 2, 1)], 0)
+        self.assertIn((date(2025, 1, 1), "B", 2000000), revenue.revenue_rows('building'))
+        self.assertIn((date(2025, 1, 1), "Toshkent", 7000000), revenue.revenue_rows('city'))
+
+        # Yopilgan oylar jadvaldan olinadi: faqat joriy oy hisoblanadi
+        with CaptureQueriesContext(connection) as queries:
+            revenue.revenue_rows()
+        self.assertEqual(len(queries), 2)
+
+        # O'tgan oy to'lovi o'sha oy natijasini yangilaydi
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(f'/clients/{contract_id}/process-payment/', {'payment_type': 'custom', 'custom_amount': 1000000}, format='json')
+        month = date.fromisoformat(response.data['allocations'][0]['date']).replace(day=1)
+        self.assertFalse(MonthlyRevenue.objects.filter(month=month).exists())
+        # Oy tushumiga faqat shu oyda tuzilgan shartnomalar to'lovlari kiradi:
+        # yanvar shartnomasining fevral to'lovi hisoblanmaydi
+        self.assertEqual(dict(revenue.revenue_rows())[month], 0)
+        Client.objects.filter(pk=contract_id).update(created=day_start(month))
+        self.assertEqual(revenue.revenue_by_building(month, revenue.next_month(month)), {month: {self.building.pk: 1000000}})
+
+    def test_statistics_download_grouped(self):
+        self.create_contract("1", term=12, payment=5000000)
+        response = self.api.get('/statistics/download-all/', {'output': 'csv', 'by': 'building'})
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], "N,Oy kesimi,Bino,Tushum (so'm)")
+        self.assertIn("Yanvar 2025-yil,A,5000000", lines[1])
+        self.assertEqual(self.api.get('/statistics/download-all/', {'by': 'street'}).status_code, 400)
+
+    def assertRollupMatchesLedger(self):
+        stored = {
+            (row.day, row.building_id, row.kind): row.amount
+            for row in DailyRevenue.objects.exclude(amount=0)
+        }
+        self.assertEqual(stored, rollups.ledger_totals())
+
+    def test_daily_revenue_follows_payment_writes(self):
+        today = timezone.localdate()
+        contract_id = self.create_contract("1", term=12, payment=5000000).data['id']
+        self.api.post(f'/clients/{contract_id}/process-payment/', {'payment_type': 'custom', 'custom_amount': 8000000}, format='json')
+        self.assertEqual(rollups.revenue_between(today, today, group_by='kind'), {
+            rollups.KIND_ADVANCE: 5000000, rollups.KIND_MONTHLY: 8000000,
+        })
+        self.assertRollupMatchesLedger()
+
+        unpaid = Rasrochka.objects.filter(client_id=contract_id, qoldiq__gt=0).order_by('month').first()
+        response = self.api.post(f'/clients/{contract_id}/process-payment/', {'payment_type': 'monthly', 'debt_id': unpaid.pk, 'amount': 100000}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.api.post(f'/clients/{contract_id}/update-months-count/', {'months_count': 6}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertRollupMatchesLedger()
+
+        response = self.api.get('/statistics/revenue/', {'start': today.isoformat(), 'by': 'building'})
+        self.assertEqual(response.data['items'], [
+            {'key': self.building.pk, 'name': "A", 'amount': rollups.revenue_between(today)},
+        ])
+        tushum = self.api.get('/dashboard/').data['tushum']
+        self.assertEqual(tushum['kunlik_tushum'], response.data['total'])
+        self.assertTrue(tushum['status'])
+
+        self.api.delete(f'/clients/{contract_id}/')
+        self.assertEqual(rollups.revenue_between(), 0)
+
+    def test_rebuild_revenue_command(self):
+        self.create_contract("1", term=12, payment=5000000)
+        self.create_contract("2", term=12, payment=3000000)
+        DailyRevenue.objects.update(amount=0)
+        call_command('rebuild_revenue', stdout=io.StringIO())
+        self.assertRollupMatchesLedger()
+        self.assertEqual(rollups.revenue_between(), 8000000)
+
+    def test_payment_reminders_sent_once(self):
+        first = self.create_contract("1", term=12, payment=5000000).data['id']
+        self.create_contract("2", term=12, payment=5000000)
+        first_due = Rasrochka.objects.filter(client_id=first, month=1).get().date
+        today = timezone.localtime(first_due).date() - timedelta(days=2)
+
+        totals = reminders.send_reminders(today=today, days=3, batch_size=1)
+        # Blok telefon chegarasida kesiladi: ikki shartnoma - bitta SMS
+        self.assertEqual(totals, {'upcoming': (2, 1), 'overdue': (0, 0)})
+        message = SmsMessage.objects.filter(campaign__kind='reminder').get()
+        self.assertEqual(message.phone, '+998901234567')
+        self.assertEqual(message.text.count("3,700,000 so'm to'lov qilishingiz kerak"), 2)
+        self.assertTrue(Job.objects.filter(kind='sms', status='pending').exists())
+        self.assertEqual(reminders.send_reminders(today=today, days=3), {'upcoming': (0, 0), 'overdue': (0, 0)})
+
+        # Bir oydan keyin: ikki shartnomaning 1- va 2-oylari muddati o'tgan
+        later = today + timedelta(days=40)
+        totals = reminders.send_reminders(today=later, days=0, batch_size=3)
+        self.assertEqual(totals['overdue'], (4, 1))
+        # Bitta telefonning ikki shartnomasi - bitta SMS
+        overdue = SmsMessage.objects.filter(campaign__reminders__kind='overdue').distinct().get()
+        self.assertEqual(overdue.text.count("7,400,000 so'm to'lov muddati o'tgan"), 2)
+        self.assertEqual(PaymentReminder.objects.filter(kind='overdue').count(), 4)
+
+class ScheduleTest(SimpleTestCase):
+    """Tasodifiy (seed bilan takrorlanadigan) kirishlarda jadval xossalarini tekshiradi."""
+
+    def random_cases(self, count=500, seed=20241001):
+        rng = random.Random(seed)
+        for _ in range(count):
+            price = rng.randrange(0, 2_000_000_000, 1000)
+            advance = rng.choice([0, rng.randrange(0, price + 1, 1000) if price else 0, price])
+            term = rng.randint(1, 120)
+            pay_day = rng.randint(1, 31)
+            start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 1500))
+            yield price, advance, term, pay_day, start
+
+    def test_amounts_reconcile_to_residual(self):
+        for price, advance, term, pay_day, start in self.random_cases():
+            jadval = schedule.build_schedule(price, advance, term, pay_day, start)
+            self.assertEqual(jadval.residual, price - advance)
+            self.assertEqual(jadval.total, jadval.residual)
+            self.assertTrue(all(amount >= 0 for amount in jadval.amounts))
+            self.assertEqual(len(jadval.dates), len(jadval.amounts))
+            if jadval.residual:
+                self.assertEqual(len(jadval), term)
+                self.assertEqual(jadval.monthly % schedule.ROUNDING_STEP, 0)
+
+    def test_dates_are_monthly_on_pay_day(self):
+        for price, advance, term, pay_day, start in self.random_cases(count=200):
+            jadval = schedule.build_schedule(price, advance, term, pay_day, start)
+            dates = [payment_date for _, payment_date, _ in jadval]
+            self.assertTrue(all(a < b for a, b in zip(dates, dates[1:])))
+            self.assertTrue(all(d > start for d in dates))
+            for d in dates:
+                self.assertEqual(d.day, min(pay_day, calendar.monthrange(d.year, d.month)[1]))
+
+    def test_zero_term_requires_full_payment(self):
+        self.assertEqual(len(schedule.build_schedule(1000, 1000, 0, 10, date(2025, 1, 1))), 0)
+        with self.assertRaises(ValueError):
+            schedule.build_schedule(1000, 500, 0, 10, date(2025, 1, 1))
+
+    def test_split_amounts_with_large_monthly(self):
+        for residual, term, monthly in [(250, 5, 100), (0, 3, 100), (99, 1, 100), (1000, 4, 0)]:
+            amounts = schedule.split_amounts(residual, term, monthly)
+            self.assertEqual(len(amounts), term)
+            self.assertEqual(sum(amounts), residual)
+            self.assertTrue(all(0 <= amount for amount in amounts))
+
+    def test_split_amounts_matches_month_by_month_loop(self):
+        # Avvalgi hisob: har oy min(monthly, qolgan), oxirgi oy qolgan hamma summa
+        def loop(residual, term, monthly):
+            amounts, remaining = [], residual
+            for month in range(1, term + 1):
+                amount = remaining if month == term else min(monthly, remaining)
+                amounts.append(amount)
+                remaining -= amount
+            return amounts
+
+        for residual, term, monthly in [(250, 5, 100), (0, 3, 100), (1000, 4, 0), (500000, 12, 0), (1200, 4, 300)]:
+            self.assertEqual(list(schedule.split_amounts(residual, term, monthly)), loop(residual, term, monthly))
+
+    def test_small_residual_is_due_in_last_month(self):
+        # 500 000 / 12 oylik to'lov 0 gacha yaxlitlanadi: summa oxirgi oyga tushadi
+        jadval = schedule.build_schedule(1500000, 1000000, 12, 10, date(2025, 1, 1))
+        self.assertEqual(jadval.monthly, 0)
+        self.assertEqual(list(jadval.amounts), [0] * 11 + [500000])
+
+    def test_batch_matches_single(self):
+        cases = list(self.random_cases(count=300))
+        for case, jadval in zip(cases, schedule.build_schedules(cases)):
+            single = schedule.build_schedule(*case)
+            self.assertEqual(list(jadval), list(single))
+            self.assertEqual(jadval.monthly, single.monthly)
+
+
+def build_home_workbook(rows, images=()):
+    """Import uchun xlsx: rows - qiymatlar, images - rasm joylanadigan kataklar (masalan 'G2')."""
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(['Narxi', 'Xona raqami', 'Podezd', 'Qavat', 'Xonalar soni', 'Maydoni', 'Loyiha', 'Chertoj'])
+    for row in rows:
+        sheet.append(row)
+    for anchor in images:
+        png = io.BytesIO()
+        Image.new('RGB', (4, 4), 'red').save(png, 'PNG')
+        png.seek(0)
+        sheet.add_image(SheetImage(png), anchor)
+    content = io.BytesIO()
+    wb.save(content)
+    return content.getvalue()
+
+
+class HomeImportTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('admin', password='admin'))
+        self.building = Building.objects.create(
+            city=City.objects.create(name="Toshkent"), name="A", podezd=1, apartments=[10], floor=9,
+        )
+
+    def test_upload_imports_rows_and_embedded_images(self):
+        content = build_home_workbook(
+            [[1000000, 1, 1, 1, 2, '50,5'], [1200000, 2, 1, 2, 3, 60], ['narx', 3, 1, 1, 1, 40]],
+            images=['G2', 'H3'],
+        )
+        response = self.api.post('/home-upload/', {
+            'building': self.building.pk,
+            'file': SimpleUploadedFile('homes.xlsx', content),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 202)
+        job_url = f"/jobs/{response.data['job']}/"
+        self.assertEqual(self.api.get(job_url).data['status'], 'pending')
+        self.assertFalse(Home.objects.filter(building=self.building).exists())
+
+        jobs.discover()
+        self.assertEqual(jobs.run_pending(), 1)
+
+        job = self.api.get(job_url).data
+        self.assertEqual((job['status'], job['processed'], job['failed']), ('done', 2, 1))
+        self.assertIn("Qator 4", job['errors'][0])
+        self.assertEqual(job['result']['created'], 2)
+        self.assertFalse(Job.objects.get(pk=job['id']).file)
+
+        homes = {home.home.home_number: home for home in Home.objects.filter(building=self.building).select_related('home')}
+        self.assertEqual(set(homes), {'1', '2'})
+        self.assertEqual(homes['1'].home.field, 50.5)
+        self.assertTrue(all(home.home.home_model_id == home.pk for home in homes.values()))
+        self.assertRegex(homes['1'].home.floor_plan.name, r'^floor_plans/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertFalse(homes['1'].home.floor_plan_drawing)
+        self.assertTrue(homes['2'].home.floor_plan_drawing.name.startswith('floor_plan_drawings/'))
+        # Ikkala rasm bir xil - ombor har papkada bitta nusxa saqlaydi
+        self.assertEqual(StoredBlob.objects.get(name=homes['1'].home.floor_plan.name).refs, 1)
+
+        self.building.refresh_from_db()
+        self.assertTrue(self.building.status)
+        self.assertEqual((self.building.homes_total, self.building.homes_free), (2, 2))
+
+    def test_queries_are_batched(self):
+        rows = [[1000000, number, 1, 1, 2, 50] for number in range(1, 101)]
+        source = io.BytesIO(build_home_workbook(rows))
+        with CaptureQueriesContext(connection) as queries:
+            successful_count, errors = import_homes(self.building, source, batch_size=40)
+        self.assertEqual((successful_count, errors), (100, []))
+        self.assertEqual(HomeInformation.objects.filter(home_model_id__isnull=False).count(), 100)
+        # 3 ta blok x (2 bulk_create + 1 bulk_update + savepoint) + hisoblagichlar va bino
+        self.assertLess(len(queries), 25)
+
+    def test_failed_job_is_reported(self):
+        job = jobs.enqueue('home_import', {'building': self.building.pk},
+                           file=SimpleUploadedFile('homes.xlsx', b'not a workbook'))
+        jobs.discover()
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.result['detail'])
+        self.assertIsNone(jobs.claim_next())
+
+    def test_stale_jobs_are_requeued_by_heartbeat(self):
+        long_running = jobs.enqueue('home_import', {'building': self.building.pk})
+        dead = jobs.enqueue('home_import', {'building': self.building.pk})
+        self.assertEqual(jobs.claim_next().pk, long_running.pk)
+        self.assertEqual(jobs.claim_next().pk, dead.pk)
+        hour_ago = timezone.now() - timedelta(hours=2)
+        Job.objects.update(started=hour_ago, heartbeat=hour_ago)
+        # Katta import hali jarayonini yozib turibdi
+        jobs.report_progress(long_running, 500, 0, [])
+
+        self.assertEqual(jobs.requeue_stale(timedelta(hours=1)), 1)
+        self.assertEqual(Job.objects.get(pk=long_running.pk).status, 'running')
+        self.assertEqual(Job.objects.get(pk=dead.pk).status, 'pending')
+
+    def test_failed_import_removes_only_its_own_homes(self):
+        info = HomeInformation.objects.create(padez_number=1, home_number='0', home_floor=1, xona=1, field=30, price=1)
+        Home.objects.create(building=self.building, home=info)
+
+        def failing_import(building, source, progress=None, on_batch=None):
+            import_homes(building, source, batch_size=1, progress=progress, on_batch=on_batch)
+            raise RuntimeError("disk to'ldi")
+
+        content = build_home_workbook([[1000000, 1, 1, 1, 2, 50], [1200000, 2, 1, 2, 3, 60]], images=['G2'])
+        jobs.enqueue('home_import', {'building': self.building.pk}, file=SimpleUploadedFile('homes.xlsx', content))
+        jobs.discover()
+        with mock.patch('api.jobs.import_homes', side_effect=failing_import):
+            jobs.run_pending()
+
+        self.assertEqual(list(Home.objects.filter(building=self.building).values_list('home_id', flat=True)), [info.pk])
+        self.assertEqual(list(HomeInformation.objects.values_list('pk', flat=True)), [info.pk])
+        self.assertFalse(StoredBlob.objects.filter(refs__gt=0).exists())
+        self.building.refresh_from_db()
+        self.assertEqual(self.building.homes_total, 1)
+
+    def test_requeued_import_does_not_duplicate_committed_batches(self):
+        def interrupted_import(building, source, progress=None, on_batch=None):
+            import_homes(building, source, batch_size=1, progress=progress, on_batch=on_batch)
+            raise KeyboardInterrupt
+
+        rows = [[1000000, 1, 1, 1, 2, 50], [1200000, 2, 1, 2, 3, 60]]
+        job = jobs.enqueue('home_import', {'building': self.building.pk},
+                           file=SimpleUploadedFile('homes.xlsx', build_home_workbook(rows)))
+        jobs.discover()
+        # Ikkala blok yozilgach worker to'xtaydi: vazifa running holatida qoladi
+        with mock.patch('api.jobs.import_homes', side_effect=interrupted_import), \
+                self.assertRaises(KeyboardInterrupt):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(len(job.payload['created']), 2)
+        self.assertTrue(job.file)
+
+        Job.objects.filter(pk=job.pk).update(heartbeat=timezone.now() - timedelta(hours=2))
+        self.assertEqual(jobs.requeue_stale(timedelta(hours=1)), 1)
+        self.assertEqual(jobs.run_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(Home.objects.filter(building=self.building).count(), 2)
+        self.assertEqual(sorted(job.payload['created']), sorted(HomeInformation.objects.values_list('pk', flat=True)))
+        self.building.refresh_from_db()
+        self.assertEqual(self.building.homes_total, 2)
+
+
+class ImageServer(ThreadingHTTPServer):
+    """Testlar uchun rasm serveri: /plan*.png - bir xil rasm, /flaky.png - avval 503, boshqasi 404."""
+    daemon_threads = True
+
+    def __init__(self):
+        png = io.BytesIO()
+        Image.new('RGB', (4, 4), 'blue').save(png, 'PNG')
+        self.content = png.getvalue()
+        self.hits = {}
+        self.hits_lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), ImageRequestHandler)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.hits_lock:
+            hits = self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if self.path.startswith('/plan') or (self.path == '/flaky.png' and hits > 1):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(self.server.content)))
+            self.end_headers()
+            self.wfile.write(self.server.content)
+        else:
+            self.send_response(503 if self.path == '/flaky.png' else 404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class ImageFetcherTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ImageServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.hits.clear()
+
+    def test_fetch_dedup_and_retries(self):
+        urls = [self.server.url(path) for path in ('/plan1.png', '/plan2.png', '/plan1.png', '/flaky.png', '/missing.png')]
+        with ImageFetcher(workers=4, per_host=2, backoff=0) as fetcher:
+            fetcher.fetch_all(urls)
+            self.assertEqual(fetcher.get(urls[0]), self.server.content)
+            self.assertEqual(fetcher.get(urls[3]), self.server.content)
+            self.assertIsNone(fetcher.get(urls[4]))
+            # Bir xil tarkib - bitta vaqtinchalik fayl
+            self.assertEqual(fetcher.results[urls[0]], fetcher.results[urls[1]])
+
+        self.assertEqual(self.server.hits['/plan1.png'], 1)
+        self.assertEqual(self.server.hits['/flaky.png'], 2)
+
+    def test_import_stores_shared_plan_once(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        building = Building.objects.create(
+            city=City.objects.create(name="Toshkent"), name="A", podezd=1, apartments=[3], floor=9,
+        )
+        rows = [
+            [1000000, number, 1, 1, 2, 50, self.server.url(f'/plan{number % 2}.png')]
+            for number in range(1, 5)
+        ]
+        with override_settings(MEDIA_ROOT=media_root):
+            successful_count, errors = import_homes(building, io.BytesIO(build_home_workbook(rows)))
+
+        self.assertEqual((successful_count, errors), (4, []))
+        names = set(HomeInformation.objects.values_list('floor_plan', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertEqual(self.server.hits, {'/plan0.png': 1, '/plan1.png': 1})
+
+
+class ContentStorageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('admin', password='admin'))
+        self.building = create_building(City.objects.create(name="Toshkent"), "A", homes=2)
+
+    def plan(self, color):
+        png = io.BytesIO()
+        Image.new('RGB', (4, 4), color).save(png, 'PNG')
+        return SimpleUploadedFile('plan.png', png.getvalue())
+
+    def test_shared_plan_is_deleted_with_last_reference(self):
+        first, second = Home.objects.filter(building=self.building).order_by('home__home_number')
+        for home in (first, second):
+            home.home.floor_plan = self.plan('red')
+            home.home.save()
+        shared = first.home.floor_plan.name
+        storage = first.home.floor_plan.storage
+        self.assertEqual(HomeInformation.objects.get(pk=second.home.pk).floor_plan.name, shared)
+        self.assertEqual(StoredBlob.objects.get(name=shared).refs, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.put(f'/homes/{first.pk}/', {
+                'home_number': '1', 'field': '50', 'price': 1000000, 'home_floor': 1, 'xona': 2,
+                'busy': False, 'floor_plan': self.plan('green'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        replaced = HomeInformation.objects.get(pk=first.home.pk).floor_plan.name
+        self.assertNotEqual(replaced, shared)
+        self.assertTrue(storage.exists(shared))
+        self.assertEqual(StoredBlob.objects.get(name=shared).refs, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api.delete(f'/homes/{second.pk}/').status_code, 204)
+        self.assertFalse(storage.exists(shared))
+        self.assertFalse(StoredBlob.objects.filter(name=shared).exists())
+        self.assertTrue(storage.exists(replaced))
+
+    def test_thumbnails_are_cached_and_removed_with_image(self):
+        home = Home.objects.filter(building=self.building).first()
+        png = io.BytesIO()
+        Image.new('RGB', (2000, 1000), 'red').save(png, 'PNG')
+        home.home.floor_plan = SimpleUploadedFile('plan.png', png.getvalue())
+        with self.captureOnCommitCallbacks(execute=True):
+            home.home.save()
+        storage = home.home.floor_plan.storage
+
+        # Nusxa hali yo'q: so'rov rasmni qayta ishlamaydi, asl rasm URL i qaytadi
+        with mock.patch('main.thumbnails.render_webp') as render:
+            info = self.api.get(f'/homes/{home.pk}/').data['home_info']
+        render.assert_not_called()
+        self.assertTrue(info['floor_plan_thumb_url'].endswith('.png'))
+
+        jobs.discover()
+        job = Job.objects.get(kind='thumbnails')
+        self.assertEqual(job.payload, {'names': [home.home.floor_plan.name]})
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result['created']), ('done', 2))
+
+        info = self.api.get(f'/homes/{home.pk}/').data['home_info']
+        self.assertTrue(info['floor_plan_thumb_url'].endswith('.webp'))
+        self.assertIsNone(info['floor_plan_drawing_thumb_url'])
+        thumb = thumbnails.derivative_name(home.home.floor_plan.name, 'thumb')
+        with storage.open(thumb) as f, Image.open(f) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 160)))
+
+        with mock.patch('main.thumbnails.render_webp') as render:
+            again = self.api.get(f'/homes/{home.pk}/').data['home_info']
+        render.assert_not_called()
+        self.assertEqual(again['floor_plan_medium_url'], info['floor_plan_medium_url'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.delete(f'/homes/{home.pk}/')
+        self.assertFalse(storage.exists(thumb))
+
+
+
+class ReportExportTest(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('admin', password='admin'))
+        self.city = City.objects.create(name="Toshkent")
+        self.building = create_building(self.city, "A", homes=3, busy=1)
+
+    def test_homes_csv_is_streamed(self):
+        response = self.api.get('/home-download/', {'building': self.building.pk, 'output': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], "N,PODEZD,QAVAT,XONA,M2,NARXI,HOLATI")
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(sum("Band" in line for line in lines[1:]), 1)
+
+    def test_homes_xlsx(self):
+        response = self.api.get('/home-download/', {'output': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+        wb = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(wb.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0][0], "N")
+        self.assertEqual(len(rows), 4)
+
+    def test_pdf_reports_are_real_pdf(self):
+        for url in ('/home-download/', '/client-export/', '/statistics/download-all/',
+                    '/statistics/download/2024-10-01:::2024-10-31/'):
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response['Content-Type'], 'application/pdf')
+            self.assertTrue(response.content.startswith(b'%PDF'), url)
+
+    def test_unknown_format(self):
+        response = self.api.get('/client-export/', {'output': 'docx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_contract_export_honours_filters(self):
+        other = create_building(self.city, "B", homes=2)
+        for building, number in ((self.building, "2"), (other, "1"), (other, "2")):
+            response = self.api.post('/clients/', {
+                'building': building.pk, 'padez_number': 1, 'home_number': number,
+                'full_name': f"Mijoz {number}", 'phone': '901234567', 'passport': 'AA1234567',
+                'term': 6, 'payment': 100000, 'status': 'Rasmiylashtirilgan',
+                'pay_date': 10, 'price': 1000000, 'created': '2025-01-20',
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get('/clients/export/', {'building': other.pk, 'output': 'csv'})
+            lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(",B,1," in line for line in lines[1:]))
+        self.assertLessEqual(len(queries), 3)
+
+    def test_client_info_export_xlsx(self):
+        ClientInformation.objects.create(full_name="Ali", phone="+998901234567", heard="Telegramda")
+        ClientInformation.objects.create(full_name="Vali", phone="+998901234568", heard="YouTubeda")
+        response = self.api.get('/client-info/export/', {'filter': '0'})
+        self.assertEqual(response.status_code, 200)
+        wb = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(wb.active.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], "Ali")
+
+
+class SmsServer(ThreadingHTTPServer):
+    """Testlar uchun SMS provayderi: FLAKY raqami avval 503, INVALID - 400, qolganlari 200."""
+    daemon_threads = True
+    FLAKY = '+998900000001'
+    INVALID = '+998900000002'
+
+    def __init__(self):
+        self.received = []
+        self.attempts = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), SmsRequestHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/api/message/sms/send"
+
+
+class SmsRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        form = {key: values[0] for key, values in parse_qs(body).items()}
+        phone = form['mobile_phone']
+        with self.server.lock:
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+            attempts = self.server.attempts[phone] = self.server.attempts.get(phone, 0) + 1
+        time.sleep(0.01)
+        with self.server.lock:
+            self.server.active -= 1
+            self.server.received.append((phone, form['message'], self.headers['Authorization']))
+
+        if phone == SmsServer.INVALID:
+            code, payload = 400, b'{"status": "error"}'
+        elif phone == SmsServer.FLAKY and attempts == 1:
+            code, payload = 503, b''
+        else:
+            code, payload = 200, b'{"status": "waiting"}'
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class SmsSenderTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = SmsServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.received.clear()
+        self.server.attempts.clear()
+        self.server.max_active = 0
+
+    def sender(self, **options):
+        options = {'url': self.server.url, 'token': 'secret', 'concurrency': 4, 'rate': 1000, 'backoff': 0, **options}
+        return SmsSender(**options)
+
+    def test_bulk_send_results_and_retries(self):
+        phones = [f'+99890100{number:04d}' for number in range(40)] + [SmsServer.FLAKY, SmsServer.INVALID]
+        results = self.sender().send((phone, "Salom") for phone in phones)
+
+        self.assertEqual([result['phone'] for result in results], phones)
+        self.assertTrue(all(result['ok'] for result in results[:-1]))
+        self.assertEqual(results[-2]['attempts'], 2)
+        self.assertEqual((results[-1]['ok'], results[-1]['status'], results[-1]['attempts']), (False, 400, 1))
+        self.assertLessEqual(self.server.max_active, 4)
+        self.assertEqual({auth for _, _, auth in self.server.received}, {'Bearer secret'})
+
+    def test_rate_limit(self):
+        started = time.monotonic()
+        self.sender(rate=50, concurrency=10).send((f'+99890200{number:04d}', "Salom") for number in range(60))
+        # 50 tasi darhol (burst), qolgan 10 tasi sekundiga 50 tezlikda
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+
+    def test_connection_error_is_reported(self):
+        result = self.sender(url='http://127.0.0.1:9/', retries=1).send([('+998901234567', "Salom")])[0]
+        self.assertFalse(result['ok'])
+        self.assertIsNone(result['status'])
+        self.assertEqual(result['attempts'], 2)
+
+
+class SmsOutboxTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = SmsServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.received.clear()
+        self.server.attempts.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('admin', password='admin'))
+        self.sender = SmsSender(url=self.server.url, token='secret', concurrency=4, rate=1000, backoff=0)
+
+    def test_send_sms_only_enqueues(self):
+        def broadcast():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.api.post('/client-info/send-sms/', {'sms_text': "Aksiya", 'recipient_type': 'all'}, format='json')
+            self.assertEqual(response.status_code, 202)
+            return response, len(queries)
+
+        ClientInformation.objects.create(full_name="Ali", phone=SmsServer.FLAKY, heard="Telegramda")
+        _, few = broadcast()
+        ClientInformation.objects.bulk_create([
+            ClientInformation(full_name=f"Mijoz {number}", phone=f'+99890300{number:04d}', heard="YouTubeda")
+            for number in range(80)
+        ] + [ClientInformation(full_name="Takror", phone=SmsServer.FLAKY, heard="YouTubeda")])
+        response, many = broadcast()
+
+        self.assertEqual(few, many)
+        self.assertEqual(self.server.received, [])
+        campaign = SmsCampaign.objects.get(pk=response.data['campaign'])
+        self.assertEqual(campaign.total, 81)
+        self.assertEqual(Job.objects.get(pk=response.data['job']).kind, 'sms')
+
+    def test_drain_records_delivery(self):
+        phones = [f'+99890400{number:04d}' for number in range(7)] + [SmsServer.FLAKY, SmsServer.INVALID]
+        campaign = outbox.enqueue_broadcast("Salom", phones)
+
+        sent, failed = outbox.drain(batch_size=4, sender=self.sender)
+        self.assertEqual((sent, failed), (8, 1))
+        flaky = SmsMessage.objects.get(campaign=campaign, phone=SmsServer.FLAKY)
+        self.assertEqual((flaky.status, flaky.attempts, flaky.provider_status), ('sent', 2, 200))
+        invalid = SmsMessage.objects.get(campaign=campaign, phone=SmsServer.INVALID)
+        self.assertEqual((invalid.status, invalid.provider_status), ('failed', 400))
+
+        # Qayta ishga tushirish yuborilganlarni qayta yubormaydi
+        received = len(self.server.received)
+        self.assertEqual(outbox.drain(sender=self.sender), (0, 0))
+        self.assertEqual(outbox.retry_failed(campaign), 1)
+        self.assertEqual(outbox.drain(sender=self.sender), (0, 1))
+        self.assertEqual(len(self.server.received), received + 1)
+
+        summary = self.api.get(f'/sms-campaigns/{campaign.pk}/').data
+        self.assertEqual(summary['statuses'], {'pending': 0, 'sending': 0, 'sent': 8, 'failed': 1, 'unknown': 0})
+
+    def test_stale_messages_are_not_resent_automatically(self):
+        campaign = outbox.enqueue_broadcast("Salom", ['+998905000000'])
+        self.assertEqual(len(outbox.claim_batch()), 1)
+        self.assertEqual(outbox.claim_batch(), [])
+        SmsMessage.objects.update(claimed=timezone.now() - timedelta(hours=1))
+        # Provayder xabarni qabul qilgan bo'lishi mumkin: takror SMS yuborilmaydi
+        self.assertEqual(outbox.expire_stale(), 1)
+        self.assertEqual(outbox.drain(sender=self.sender), (0, 0))
+        self.assertEqual(SmsMessage.objects.get(campaign=campaign).status, 'unknown')
+        self.assertEqual(self.server.received, [])
+
+        self.assertEqual(outbox.retry_failed(campaign), 0)
+        self.assertEqual(outbox.retry_failed(campaign, unknown=True), 1)
+        self.assertEqual(outbox.drain(sender=self.sender), (1, 0))
+        self.assertEqual(SmsMessage.objects.get(campaign=campaign).status, 'sent')
+
+
+class BenchmarkTest(TestCase):
+    SCENARIOS = ('dashboard', 'clients', 'process-payment', 'contract-pdf')
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def test_seed_data(self):
+        reset_blocks()
+        call_command('seed_data', cities=1, buildings=2, homes=5, clients=8, years=2, stdout=io.StringIO())
+        self.assertEqual((Building.objects.count(), Home.objects.count(), Client.objects.count()), (2, 10, 8))
+        self.assertEqual(sum(Building.objects.values_list('homes_busy', flat=True)), 8)
+        for contract in Client.objects.all():
+            self.assertEqual(contract.residual, sum(contract.payments.values_list('qoldiq', flat=True)))
+            self.assertGreaterEqual(contract.payments.count(), 13)
+        self.assertEqual(rollups.revenue_between(), sum(Rasrochka.objects.values_list('amount_paid', flat=True)))
+        self.assertEqual(sorted(Client.objects.values_list('contract', flat=True)), list(range(1, 9)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(next_contract_number(), 9)
+
+    def test_run_benchmarks_and_compare(self):
+        output = os.path.join(self.dir, 'results.json')
+        baseline = os.path.join(self.dir, 'baseline.json')
+        call_command('run_benchmarks', *self.SCENARIOS, seed=24, repeat=2, output=output,
+                     baseline=baseline, save_baseline=True, stdout=io.StringIO())
+        with open(output) as f:
+            report = json.load(f)
+        results = report['scenarios']
+        self.assertEqual(list(results), list(self.SCENARIOS))
+        self.assertEqual(report['dataset']['contracts'], 24)
+        self.assertEqual((results['process-payment']['status'], results['contract-pdf']['status']), (200, 202))
+        self.assertTrue(all(result['runs'] == 2 and result['queries'] > 0 for result in results.values()))
+        # Sinov ma'lumotlari va to'lovlar bekor qilinadi
+        self.assertFalse(Client.objects.exists())
+
+        # So'rovlar soni oshsa - regressiya
+        report['scenarios']['dashboard']['queries'] -= 1
+        with open(baseline, 'w') as f:
+            json.dump(report, f)
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, "1 ta regressiya topildi"):
+            call_command('run_benchmarks', 'dashboard', seed=24, repeat=1, baseline=baseline,
+                         threshold=100, stdout=out)
+        self.assertIn("REGRESSIYA dashboard: queries", out.getvalue())
@@ -0,0 +1,98 @@
+"""
+Loyiha rasmlarining kichraytirilgan WebP nusxalari.
+
+Nusxalar rasm yuklangandan keyin fon vazifasida ('thumbnails', api.jobs)
+yaratiladi va asl rasm yonidagi derivatives/ papkasida saqlanadi. So'rov
+paytida nusxa hali bo'lmasa asl rasm URL i qaytadi - API javobi rasmni
+qayta ishlashni kutmaydi. Asl rasm nomi tarkibdan olingani uchun
+(main.storage) nusxa nomi ham o'zgarmaydi: bir xil rasmli uylar bitta
+nusxani ishlatadi.
+"""
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from main import jobs
+
+logger = logging.getLogger(__name__)
+
+# Nomi -> eng katta tomoni (piksel)
+SIZES = {
+    'thumb': 320,
+    'medium': 1024,
+}
+WEBP_QUALITY = 80
+
+
+def derivative_name(name, size):
+    base = posixpath.splitext(name)[0]
+    return f"derivatives/{size}/{base}.webp"
+
+
+def render_webp(source, max_side):
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+        image.thumbnail((max_side, max_side))
+        output = io.BytesIO()
+        image.save(output, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return output.getvalue()
+
+
+def get_derivative(storage, name, size):
+    """
+    Rasm (storage dagi name) uchun size ('thumb', 'medium') o'lchamdagi nusxa
+    nomi, kerak bo'lsa yaratadi. Rasmni o'qib bo'lmasa None qaytadi.
+    """
+    derived = derivative_name(name, size)
+    if storage.exists(derived):
+        return derived
+    try:
+        with storage.open(name, 'rb') as source:
+            content = render_webp(source, SIZES[size])
+    except Exception as e:
+        logger.warning(f"Derivative {size} for {name} failed: {e}")
+        return None
+    return storage.save_exact(derived, ContentFile(content))
+
+
+def derivative_url(field_file, size):
+    """
+    Tayyor nusxa URL i. Nusxa hali yaratilmagan bo'lsa (fon vazifasi
+    ishlamagan yoki rasmni o'qib bo'lmagan) asl rasm URL i qaytadi.
+    """
+    if not field_file:
+        return None
+    derived = derivative_name(field_file.name, size)
+    if field_file.storage.exists(derived):
+        return field_file.storage.url(derived)
+    return field_file.url
+
+
+def warm_derivatives(storage, names):
+    """Nusxalarni oldindan yaratadi (fon vazifasida: yuklangandan yoki importdan keyin)."""
+    count = 0
+    for name in set(names):
+        for size in SIZES:
+            if name and get_derivative(storage, name, size):
+                count += 1
+    return count
+
+
+def warm_after_commit(names):
+    """Tranzaksiya tugagach names rasmlari nusxalarini yaratish vazifasini navbatga qo'yadi."""
+    names = sorted({name for name in names if name})
+    if names:
+        transaction.on_commit(lambda: jobs.enqueue('thumbnails', {'names': names}))
+
+
+def delete_derivatives(storage, name):
+    for size in SIZES:
+        derived = derivative_name(name, size)
+        if storage.exists(derived):
+            storage.delete(derived)